@@ -0,0 +1,258 @@
+"""Train the fast-screening escalation classifier from historical moderation outcomes.
+
+Labels come from the videos table: a video that deep-vision analyzed or a human reviewed is a
+positive ("worth escalating") unless its final decision was "approved"; human decisions win over
+deep-vision ones. Videos screening approved on its own are unverified negatives: leaving them out
+would train and evaluate only on traffic the current rule already escalated. Positives hidden among
+them are never observed, so reported recall is an upper bound; test metrics are printed for all
+screened traffic and for the verified (downstream-reviewed) subset. Inputs are the per-frame feature matrices fast-screening exports to
+features/{video_id}.npy, aggregated by the service's own screening_feature_vector
+(services/shared/screening_features.py).
+
+The model is L2-regularized logistic regression fitted in pure NumPy. Videos are split by a hash of
+video_id into train / validation / test; the escalation threshold is the highest one that reaches
+--target-recall on validation, and escalation rate vs recall is reported on the held-out test split
+next to the current hand-tuned rule. Unless --dry-run is given, the model is uploaded as
+models/screening/vN.json and the latest.json pointer is moved to it (fast-screening picks it up
+within SCREENING_MODEL_POLL_SECONDS).
+
+Usage:
+    python train_screening_classifier.py --target-recall 0.98
+    python train_screening_classifier.py --dry-run --output model.json
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+import boto3
+import numpy as np
+from botocore.exceptions import ClientError
+
+AWS_REGION = os.getenv("AWS_REGION", "us-west-2")
+S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
+DYNAMODB_VIDEOS_TABLE = os.getenv("DYNAMODB_VIDEOS_TABLE", "guardian-videos")
+FEATURES_S3_PREFIX = os.getenv("FEATURES_S3_PREFIX", "features/")
+MODEL_PREFIX = os.getenv("SCREENING_MODEL_PREFIX", "models/screening/")
+RISK_ESCALATION_THRESHOLD = float(os.getenv("RISK_ESCALATION_THRESHOLD", "0.15"))
+
+# Feature aggregation shared with fast-screening, imported from the source tree
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "services", "shared"))
+from screening_features import FEATURE_COLUMNS, SCREENING_MODEL_FEATURES as FEATURES, VIOLENT_KEYWORDS, screening_feature_vector
+
+
+def feature_vector(frame_features, has_violent_keyword):
+    """screening_feature_vector as a row in FEATURES order"""
+    values = screening_feature_vector(frame_features, has_violent_keyword)
+    return np.array([values[name] for name in FEATURES], dtype=np.float64)
+
+
+def outcome_label(video):
+    """(label, verified): 1 if the video needed deep analysis, 0 if it was approved; None if unusable.
+
+    verified is False for videos screening auto-approved, which no downstream step ever checked.
+    """
+    decision = video.get("decision")
+    if not decision or decision == "pending":
+        return None
+    if not (video.get("human_reviewed") or video.get("analyzed_at")):
+        # auto-approved straight from screening: a negative, but an unverified one
+        return (0, False) if decision == "approved" else None
+    return (0 if decision == "approved" else 1), True
+
+
+def load_dataset(s3_client, videos_table, limit=0):
+    """(X, y, video_ids, verified) for every labeled video whose feature matrix is in S3"""
+    rows, labels, video_ids, verified = [], [], [], []
+    missing = 0
+    scan = {}
+    while True:
+        response = videos_table.scan(**scan)
+        for video in response.get("Items", []):
+            outcome = outcome_label(video)
+            if outcome is None:
+                continue
+            video_id = video["video_id"]
+            try:
+                body = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=f"{FEATURES_S3_PREFIX}{video_id}.npy")["Body"]
+            except ClientError:
+                missing += 1
+                continue
+            frame_features = np.load(io.BytesIO(body.read()), allow_pickle=False).reshape(-1, len(FEATURE_COLUMNS))
+            if len(frame_features) == 0:
+                continue
+            filename = (video.get("filename") or "").lower()
+            rows.append(feature_vector(frame_features, any(k in filename for k in VIOLENT_KEYWORDS)))
+            labels.append(outcome[0])
+            verified.append(outcome[1])
+            video_ids.append(video_id)
+            if limit and len(rows) >= limit:
+                break
+        if "LastEvaluatedKey" not in response or (limit and len(rows) >= limit):
+            break
+        scan["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    print(f"📊 Loaded {len(rows)} labeled videos ({sum(labels)} positive, {len(rows) - sum(verified)} auto-approved), "
+          f"{missing} without exported features")
+    return (np.array(rows).reshape(-1, len(FEATURES)), np.array(labels, dtype=np.float64), video_ids,
+            np.array(verified, dtype=bool))
+
+
+def split_by_video(video_ids, validation=0.2, test=0.2):
+    """Deterministic train/validation/test masks from a hash of video_id (stable across retrains)"""
+    buckets = np.array([int(hashlib.sha1(v.encode()).hexdigest()[:8], 16) / 0xFFFFFFFF for v in video_ids])
+    test_mask = buckets < test
+    validation_mask = (buckets >= test) & (buckets < test + validation)
+    return ~(test_mask | validation_mask), validation_mask, test_mask
+
+
+def fit_logistic_regression(X, y, l2=1.0, iterations=500):
+    """Class-balanced, L2-regularized logistic regression by Newton's method; returns (coef, intercept)"""
+    n, d = X.shape
+    positives = max(y.sum(), 1.0)
+    negatives = max(n - y.sum(), 1.0)
+    sample_weight = np.where(y == 1, n / (2 * positives), n / (2 * negatives))
+    A = np.hstack([X, np.ones((n, 1))])
+    w = np.zeros(d + 1)
+    penalty = np.full(d + 1, l2)
+    penalty[-1] = 0.0  # intercept is not regularized
+    for _ in range(iterations):
+        p = 1.0 / (1.0 + np.exp(-np.clip(A @ w, -50.0, 50.0)))
+        gradient = A.T @ (sample_weight * (p - y)) + penalty * w
+        hessian = (A * (sample_weight * p * (1 - p))[:, None]).T @ A + np.diag(penalty + 1e-9)
+        step = np.linalg.solve(hessian, gradient)
+        w -= step
+        if np.max(np.abs(step)) < 1e-8:
+            break
+    return w[:-1], float(w[-1])
+
+
+def predict(model, X):
+    logit = ((X - model["mean"]) / model["scale"]) @ model["coef"] + model["intercept"]
+    return 1.0 / (1.0 + np.exp(-np.clip(logit, -50.0, 50.0)))
+
+
+def threshold_for_recall(scores, y, target_recall):
+    """Highest threshold whose recall (scores >= threshold) reaches target_recall"""
+    positive_scores = np.sort(scores[y == 1])[::-1]
+    if len(positive_scores) == 0:
+        return 0.5
+    needed = int(np.ceil(target_recall * len(positive_scores)))
+    return float(positive_scores[max(needed, 1) - 1])
+
+
+def escalation_report(escalate, y):
+    """Escalation rate (share of videos sent to deep-vision) and recall (share of positives escalated)"""
+    return {
+        "videos": int(len(y)),
+        "escalation_rate": float(np.mean(escalate)) if len(y) else 0.0,
+        "recall": float(np.mean(escalate[y == 1])) if np.any(y == 1) else 1.0,
+    }
+
+
+def next_version(s3_client):
+    """vN+1 for the highest vN.json already under MODEL_PREFIX"""
+    versions = [0]
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=S3_BUCKET_NAME, Prefix=MODEL_PREFIX):
+        for item in page.get("Contents", []):
+            match = re.fullmatch(rf"{re.escape(MODEL_PREFIX)}v(\d+)\.json", item["Key"])
+            if match:
+                versions.append(int(match.group(1)))
+    return f"v{max(versions) + 1}"
+
+
+def train_screening_classifier(target_recall=0.98, l2=1.0, limit=0, dry_run=False, output=None):
+    s3_client = boto3.client("s3", region_name=AWS_REGION)
+    videos_table = boto3.resource("dynamodb", region_name=AWS_REGION).Table(DYNAMODB_VIDEOS_TABLE)
+
+    X, y, video_ids, verified = load_dataset(s3_client, videos_table, limit)
+    train, validation, test = split_by_video(video_ids)
+    if len(np.unique(y[train])) < 2 or not np.any(y[validation] == 1):
+        raise SystemExit("❌ Need both outcomes in the training split and positives in validation")
+
+    mean = X[train].mean(axis=0)
+    scale = X[train].std(axis=0)
+    scale[scale == 0] = 1.0
+    coef, intercept = fit_logistic_regression((X[train] - mean) / scale, y[train], l2=l2)
+    model = {"type": "logistic_regression", "features": list(FEATURES), "mean": mean, "scale": scale,
+             "coef": coef, "intercept": intercept}
+    model["threshold"] = threshold_for_recall(predict(model, X[validation]), y[validation], target_recall)
+
+    # Held-out comparison: learned model at several recall targets vs the hand-tuned rule, on all
+    # screened traffic and on the subset whose outcome a downstream step verified
+    test_scores = predict(model, X[test])
+    keyword = X[test][:, FEATURES.index("violent_keyword")] > 0
+    heuristic = (X[test][:, FEATURES.index("heuristic_risk")] > RISK_ESCALATION_THRESHOLD) | keyword
+    escalate = test_scores >= model["threshold"]
+    checked = verified[test]
+    metrics = {"heuristic": escalation_report(heuristic, y[test]),
+               "model": escalation_report(escalate, y[test]),
+               "verified": {"heuristic": escalation_report(heuristic[checked], y[test][checked]),
+                            "model": escalation_report(escalate[checked], y[test][checked])},
+               "unverified_negatives": int((~checked).sum()), "curve": []}
+    print(f"\n{'policy':<22} {'threshold':>9} {'escalation':>10} {'recall':>7}")
+    print(f"{'heuristic':<22} {RISK_ESCALATION_THRESHOLD:>9.3f} {metrics['heuristic']['escalation_rate']:>10.1%} "
+          f"{metrics['heuristic']['recall']:>7.1%}")
+    for recall in sorted({0.90, 0.95, 0.98, 0.99, target_recall}):
+        threshold = threshold_for_recall(predict(model, X[validation]), y[validation], recall)
+        report = escalation_report(test_scores >= threshold, y[test])
+        metrics["curve"].append(dict(report, target_recall=recall, threshold=threshold))
+        marker = " ◀" if recall == target_recall else ""
+        print(f"{f'model @ recall {recall:.0%}':<22} {threshold:>9.3f} {report['escalation_rate']:>10.1%} "
+              f"{report['recall']:>7.1%}{marker}")
+    for name in ("heuristic", "model"):
+        report = metrics["verified"][name]
+        print(f"{f'{name} (verified)':<22} {'':>9} {report['escalation_rate']:>10.1%} {report['recall']:>7.1%}")
+    saved = metrics["heuristic"]["escalation_rate"] - metrics["model"]["escalation_rate"]
+    print(f"\n🎯 Escalations avoided vs heuristic: {saved:.1%} of videos "
+          f"(train={int(train.sum())}, validation={int(validation.sum())}, test={int(test.sum())})")
+    print(f"⚠️ Selection bias: {metrics['unverified_negatives']} test videos were auto-approved by the current rule "
+          f"and never reviewed; positives among them are unobserved, so recall is an upper bound")
+
+    version = next_version(s3_client) if not dry_run else "dry-run"
+    spec = {
+        "version": version,
+        "type": model["type"],
+        "features": model["features"],
+        "mean": mean.tolist(),
+        "scale": scale.tolist(),
+        "coef": coef.tolist(),
+        "intercept": intercept,
+        "threshold": model["threshold"],
+        "target_recall": target_recall,
+        "l2": l2,
+        "metrics": metrics,
+        "samples": {"train": int(train.sum()), "validation": int(validation.sum()), "test": int(test.sum())},
+        "trained_at": datetime.utcnow().isoformat(),
+    }
+    if output:
+        with open(output, "w") as f:
+            json.dump(spec, f, indent=2)
+        print(f"💾 Wrote {output}")
+    if dry_run:
+        return spec
+
+    key = f"{MODEL_PREFIX}{version}.json"
+    s3_client.put_object(Bucket=S3_BUCKET_NAME, Key=key, Body=json.dumps(spec).encode(),
+                         ContentType="application/json")
+    s3_client.put_object(Bucket=S3_BUCKET_NAME, Key=f"{MODEL_PREFIX}latest.json",
+                         Body=json.dumps({"version": version, "key": key}).encode(), ContentType="application/json")
+    print(f"✅ Published screening model {version} to s3://{S3_BUCKET_NAME}/{key}")
+    return spec
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-recall", type=float, default=0.98, help="Recall the escalation threshold must keep")
+    parser.add_argument("--l2", type=float, default=1.0, help="L2 regularization strength")
+    parser.add_argument("--limit", type=int, default=0, help="Use at most this many labeled videos (0 = all)")
+    parser.add_argument("--dry-run", action="store_true", help="Report only; do not publish to S3")
+    parser.add_argument("--output", help="Also write the model JSON to this path")
+    args = parser.parse_args()
+
+    print("🚀 Training screening escalation classifier...")
+    train_screening_classifier(args.target_recall, args.l2, args.limit, args.dry_run, args.output)
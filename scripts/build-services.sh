@@ -12,7 +12,10 @@ services=("ingestion" "fast-screening" "deep-vision" "policy-engine" "human-revi
 
 for service in "${services[@]}"; do
     echo "Building $service..."
-    docker buildx build --platform linux/amd64 -t $ACR_NAME/$service:latest --push ./services/$service
+    # fast-screening and deep-vision copy services/shared/video_io.py, so they build from services/
+    context=./services/$service
+    case $service in fast-screening|deep-vision) context=./services ;; esac
+    docker buildx build --platform linux/amd64 -t $ACR_NAME/$service:latest -f ./services/$service/Dockerfile --push $context
 done
 
 echo "All services built and pushed!"
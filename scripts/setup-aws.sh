@@ -80,7 +80,36 @@ aws s3api put-bucket-versioning \
     --versioning-configuration Status=Enabled
 print_success "Versioning enabled"
 
+# Frame artifacts (fast-screening -> deep-vision) are deleted by deep-vision after analysis;
+# expire any that are never picked up. put-bucket-lifecycle-configuration replaces the whole
+# configuration, so infrastructure/aws-lifecycle.json carries the same rule.
+print_info "Configuring frame artifact expiry for $PRIMARY_BUCKET"
+cat > /tmp/artifact-lifecycle.json <<EOF
+{
+  "Rules": [
+    {
+      "ID": "ExpireFrameArtifacts",
+      "Status": "Enabled",
+      "Filter": {
+        "Prefix": "artifacts/frames/"
+      },
+      "Expiration": {
+        "Days": 2
+      },
+      "NoncurrentVersionExpiration": {
+        "NoncurrentDays": 1
+      }
+    }
+  ]
+}
+EOF
+aws s3api put-bucket-lifecycle-configuration \
+    --bucket $PRIMARY_BUCKET \
+    --lifecycle-configuration file:///tmp/artifact-lifecycle.json
+print_success "Frame artifacts expire after 2 days"
+
 # S3 Lifecycle for Glacier (OPTIONAL - Commented out by default)
+# (applying this replaces the frame artifact rule above: use infrastructure/aws-lifecycle.json instead)
 # Uncomment to enable automatic archiving to Glacier after 90 days
 # print_info "Configuring lifecycle policy for $PRIMARY_BUCKET"
 # cat > /tmp/lifecycle.json <<EOF
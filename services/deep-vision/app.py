@@ -17,6 +17,21 @@ from typing import Optional
 import threading
 import time
 import asyncio
+import collections
+import concurrent.futures
+
+try:
+    import video_io  # copied next to app.py in the image
+except ImportError:  # running from the source tree
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+    import video_io
+from video_io import open_video, download_s3_object, local_video
+
+try:
+    import onnxruntime as ort  # only needed for INFERENCE_BACKEND=onnx
+except ImportError:
+    ort = None
 
 app = FastAPI()
 
@@ -42,6 +57,60 @@ clip_model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32").to(device
 clip_processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
 clip_model.eval()
 
+# Zero-shot label taxonomy: each group gets its own softmax over its prompts
+CLIP_LABEL_GROUPS = {
+    # First, detect if content is animated/cartoon (to reduce false positives)
+    "animation": [
+        "real life video, live action, actual people, real world",
+        "animated cartoon, animation, drawn characters, animated content",
+        "computer graphics, CGI, digital animation, rendered content"
+    ],
+    # Enhanced CLIP-based content classification with better prompts
+    "nsfw": [
+        "safe content, normal scene, everyday activity",
+        "explicit sexual content, adult material, pornography",
+        "partial nudity, revealing clothing, suggestive content",
+        "naked person, full nudity, exposed body parts"
+    ],
+    "violence": [
+        "safe content, peaceful scene, normal activity",
+        "violence, fighting, physical assault, combat",
+        "weapons, guns, knives, firearms, dangerous objects",
+        "blood, injury, wound, gore, violence aftermath"
+    ],
+}
+
+def encode_label_groups(groups=CLIP_LABEL_GROUPS):
+    """Encode every prompt once: (L2-normalized text embeddings, {group: slice of rows}, exp(logit_scale))"""
+    labels, slices = [], {}
+    for name, group in groups.items():
+        slices[name] = slice(len(labels), len(labels) + len(group))
+        labels.extend(group)
+    text_inputs = clip_processor(text=labels, return_tensors="pt", padding=True).to(device)
+    with torch.no_grad():
+        text_embeds = clip_model.get_text_features(**text_inputs)
+        text_embeds = text_embeds / text_embeds.norm(p=2, dim=-1, keepdim=True)
+        logit_scale = clip_model.logit_scale.exp()
+    return text_embeds, slices, logit_scale
+
+# Constant prompts: tokenized and encoded at startup instead of on every frame
+clip_text_embeds, clip_label_slices, clip_logit_scale = encode_label_groups()
+
+def clip_label_probs(images, encoder=None):
+    """One vision-encoder pass for a list of PIL images -> per image {group: softmax probabilities}.
+
+    Same math as CLIPModel's logits_per_image (scaled cosine similarity), against the cached
+    text embeddings, with the softmax taken separately over each label group. The image side
+    runs on the configured vision encoder (INFERENCE_BACKEND) unless one is passed in.
+    """
+    pixel_values = clip_processor(images=images, return_tensors="np")["pixel_values"]
+    with torch.no_grad():
+        image_embeds = torch.as_tensor((encoder or vision_encoder).encode(pixel_values), device=device)
+        image_embeds = image_embeds / image_embeds.norm(p=2, dim=-1, keepdim=True)
+        logits = clip_logit_scale * image_embeds @ clip_text_embeds.t()
+        probs = {name: logits[:, rows].softmax(dim=1).cpu().numpy() for name, rows in clip_label_slices.items()}
+    return [{name: group_probs[i] for name, group_probs in probs.items()} for i in range(len(images))]
+
 # AWS Configuration
 AWS_REGION = os.getenv("AWS_REGION", "us-west-2")
 DYNAMODB_VIDEOS_TABLE = os.getenv("DYNAMODB_VIDEOS_TABLE", "guardian-videos")
@@ -59,6 +128,40 @@ sqs_client = boto3.client('sqs', region_name=AWS_REGION)
 videos_table = dynamodb.Table(DYNAMODB_VIDEOS_TABLE)
 events_table = dynamodb.Table(DYNAMODB_EVENTS_TABLE)
 
+# Frame artifacts from fast-screening replace the decode when they sample at least this densely
+DEEP_SAMPLE_INTERVAL_SECONDS = float(os.getenv("DEEP_SAMPLE_INTERVAL_SECONDS", "1.0"))
+FRAME_ARTIFACTS_ENABLED = os.getenv("FRAME_ARTIFACTS_ENABLED", "true").lower() == "true"
+CLIP_BATCH_SIZE = max(1, int(os.getenv("CLIP_BATCH_SIZE", "16")))  # sampled frames per CLIP forward pass
+
+# Near-duplicate skipping: a sampled frame whose dHash is within FRAME_DEDUP_MAX_HAMMING bits (of 64) of the
+# last frame sent to CLIP reuses that frame's scores instead of running the model
+FRAME_DEDUP_ENABLED = os.getenv("FRAME_DEDUP_ENABLED", "false").lower() == "true"
+FRAME_DEDUP_MAX_HAMMING = int(os.getenv("FRAME_DEDUP_MAX_HAMMING", "4"))
+
+# Cross-request micro-batching: /analyze and the GPU-queue worker submit frames to one inference thread,
+# which runs CLIP on up to INFERENCE_MAX_BATCH_SIZE frames, waiting at most INFERENCE_MAX_WAIT_MS to fill a batch
+INFERENCE_SCHEDULER_ENABLED = os.getenv("INFERENCE_SCHEDULER_ENABLED", "true").lower() == "true"
+INFERENCE_MAX_BATCH_SIZE = max(1, int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "32")))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "10"))
+
+# CLIP vision tower backend: eager PyTorch ("torch") or ONNX Runtime ("onnx", see export_onnx_vision.py).
+# The ONNX model is read from ONNX_VISION_MODEL_PATH, downloaded there from ONNX_VISION_MODEL_S3_KEY if missing.
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+INFERENCE_BACKENDS = ("torch", "onnx")
+ONNX_VISION_MODEL_PATH = os.getenv("ONNX_VISION_MODEL_PATH", "/tmp/clip-vision-int8.onnx")
+ONNX_VISION_MODEL_S3_KEY = os.getenv("ONNX_VISION_MODEL_S3_KEY", "")
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))  # 0 = ONNX Runtime default (all cores)
+
+# Segment-focused analysis: with fast-screening's segment hints, analyze the hinted time ranges at
+# DEEP_SAMPLE_INTERVAL_SECONDS and only every SEGMENT_SPARSE_EVERY-th sample elsewhere
+SEGMENT_FOCUS_ENABLED = os.getenv("SEGMENT_FOCUS_ENABLED", "false").lower() == "true"
+SEGMENT_SPARSE_EVERY = max(1, int(os.getenv("SEGMENT_SPARSE_EVERY", "5")))
+
+# Video decoder (DECODER_BACKEND, DECODER_THREADS, DECODER_LOWRES, ...) is configured in video_io.
+# pyav: frames taller than this are scaled during the BGR conversion (CLIP works at 224px; 0 = native)
+DECODER_OUTPUT_MAX_HEIGHT = int(os.getenv("DECODER_OUTPUT_MAX_HEIGHT", "0"))
+
+
 # Model endpoints
 NSFW_ENDPOINT = os.getenv("NSFW_MODEL_ENDPOINT")
 VIOLENCE_ENDPOINT = os.getenv("VIOLENCE_MODEL_ENDPOINT")
@@ -71,36 +174,358 @@ transform = transforms.Compose([
     transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
 ])
 
+def load_frame_artifact(key):
+    """Fetch a fast-screening frame artifact as (metadata, npz arrays), or None if unusable"""
+    try:
+        body = s3_client.get_object(Bucket=S3_BUCKET, Key=key)["Body"].read()
+        bundle = np.load(io.BytesIO(body), allow_pickle=False)
+        return json.loads(str(bundle["metadata"])), bundle
+    except Exception as e:
+        print(f"⚠️  Failed to load frame artifact {key}: {e}")
+        return None
+
+def artifact_covers(metadata, interval_seconds=DEEP_SAMPLE_INTERVAL_SECONDS):
+    """True if the artifact holds the whole video sampled at least every interval_seconds"""
+    artifact_interval = metadata.get("interval_seconds", 0)
+    return metadata.get("version") == 1 and metadata.get("complete") and 0 < artifact_interval <= interval_seconds + 1e-6
+
+def iter_artifact_frames(bundle, metadata, interval_seconds=DEEP_SAMPLE_INTERVAL_SECONDS, wants=None):
+    """Yield (frame_num, seconds, BGR frame) from an artifact, thinned to interval_seconds and wants(frame_num, seconds).
+
+    frame_num comes from each frame's stored frame index with the decode path's stride, so a
+    frame missing from the artifact (a failed JPEG encode) leaves a gap instead of shifting the rest.
+    """
+    fps = metadata.get("fps") or 0
+    stride = max(1, int(fps * interval_seconds)) if fps > 0 else 30  # same stride as the decode path
+    jpeg, offsets, frame_indices = bundle["jpeg"], bundle["offsets"], bundle["frame_indices"]
+    timestamps = bundle["timestamps"]  # real seconds (frame index / fps)
+    last_num = -1
+    for i, frame_index in enumerate(frame_indices):
+        frame_num = int(frame_index) // stride
+        if frame_num == last_num:
+            continue  # the artifact samples more densely than interval_seconds
+        last_num = frame_num
+        if wants is not None and not wants(frame_num, float(timestamps[i])):
+            continue
+        frame = cv2.imdecode(jpeg[offsets[i]:offsets[i + 1]], cv2.IMREAD_COLOR)
+        if frame is not None:
+            yield frame_num, float(timestamps[i]), frame
+
+class SamplePlan:
+    """Which 1 FPS samples to analyze: all of them, or dense inside hinted ranges and sparse elsewhere"""
+
+    def __init__(self, hints=None, sample_seconds=DEEP_SAMPLE_INTERVAL_SECONDS, sparse_every=SEGMENT_SPARSE_EVERY):
+        self.ranges = [(float(h["start"]), float(h["end"])) for h in hints or []]
+        self.focused = SEGMENT_FOCUS_ENABLED and bool(self.ranges)
+        self.sample_seconds = sample_seconds
+        self.sparse_every = sparse_every
+        self.analyzed = []  # timestamps (seconds) of the analyzed samples, in order
+
+    def wants(self, sample_num, t):
+        """sample_num picks the sparse samples; t is the sample's real time (frame index / fps), as in the hints"""
+        if not self.focused or sample_num % self.sparse_every == 0:
+            return True
+        return any(start <= t <= end for start, end in self.ranges)
+
+    def weights(self):
+        """Seconds of video each analyzed sample stands for (the gap to the next analyzed sample)"""
+        if not self.analyzed:
+            return []
+        return np.diff(self.analyzed, append=self.analyzed[-1] + self.sample_seconds).tolist()
+
+    def record(self, stats):
+        if stats is not None:
+            stats["analysis_mode"] = "focused" if self.focused else "full"
+            if self.focused:
+                stats["sample_weights"] = self.weights()
+
+def percentile_90(scores, weights=None):
+    """90th percentile of per-frame scores, time-weighted when samples are unevenly spaced.
+
+    With segment-focused sampling the hinted ranges are over-represented, so each sample
+    is weighted by the seconds it stands for; the result approximates the percentile of
+    a uniform 1 FPS pass.
+    """
+    if not scores:
+        return 0.0
+    if weights is None:
+        return float(np.percentile(scores, 90))
+    order = np.argsort(scores)
+    values = np.asarray(scores, dtype=np.float64)[order]
+    w = np.asarray(weights, dtype=np.float64)[order]
+    positions = (np.cumsum(w) - 0.5 * w) / w.sum()
+    return float(np.interp(0.90, positions, values))
+
+class TorchVisionEncoder:
+    """Eager PyTorch CLIP vision tower + projection: pixel_values (N, 3, 224, 224) -> image embeddings"""
+    name = "torch"
+
+    def __init__(self, model=None):
+        self.model = model or clip_model
+
+    def encode(self, pixel_values):
+        with torch.no_grad():
+            return self.model.get_image_features(pixel_values=torch.as_tensor(pixel_values, device=device))
+
+class OnnxVisionEncoder:
+    """The same vision tower exported to ONNX (FP32 or INT8-quantized) and run with ONNX Runtime"""
+    name = "onnx"
+
+    def __init__(self, path, intra_op_threads=ONNX_INTRA_OP_THREADS):
+        if ort is None:
+            raise RuntimeError("INFERENCE_BACKEND=onnx requires onnxruntime")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.path = path
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def encode(self, pixel_values):
+        pixel_values = np.ascontiguousarray(pixel_values, dtype=np.float32)
+        return self.session.run(None, {self.input_name: pixel_values})[0]
+
+def load_vision_encoder(backend=INFERENCE_BACKEND):
+    """Vision encoder for the configured backend; falls back to torch if the ONNX model can't be loaded"""
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown INFERENCE_BACKEND: {backend} (expected one of {INFERENCE_BACKENDS})")
+    if backend == "onnx":
+        try:
+            if not os.path.exists(ONNX_VISION_MODEL_PATH) and ONNX_VISION_MODEL_S3_KEY:
+                download_s3_object(S3_BUCKET, ONNX_VISION_MODEL_S3_KEY, ONNX_VISION_MODEL_PATH + ".part")
+                os.replace(ONNX_VISION_MODEL_PATH + ".part", ONNX_VISION_MODEL_PATH)
+            encoder = OnnxVisionEncoder(ONNX_VISION_MODEL_PATH)
+            print(f"✅ CLIP vision encoder: ONNX Runtime ({ONNX_VISION_MODEL_PATH})")
+            return encoder
+        except Exception as e:
+            print(f"⚠️  Failed to load ONNX vision encoder, using PyTorch: {e}")
+    return TorchVisionEncoder()
+
+vision_encoder = load_vision_encoder()
+
+class InferenceScheduler:
+    """In-process micro-batching for CLIP: callers submit images, one inference thread batches them.
+
+    A batch starts with the oldest queued image and takes more until it holds max_batch_size
+    images or max_wait has passed since that image was queued. Requests can be split across
+    batches; each submit() future resolves with its images' results once all are scored.
+    """
+
+    def __init__(self, infer, max_batch_size=INFERENCE_MAX_BATCH_SIZE, max_wait=INFERENCE_MAX_WAIT_MS / 1000.0):
+        self.infer = infer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = collections.deque()  # (image, request, index, submitted_at)
+        self.condition = threading.Condition()
+        self.thread = None
+        self.batches = 0
+        self.images = 0
+        self.waits = collections.deque(maxlen=4096)  # seconds from submit to batch start
+        self.batch_sizes = collections.deque(maxlen=1024)
+
+    def submit(self, images):
+        """concurrent.futures.Future resolving to one infer() result per image (await via asyncio.wrap_future)"""
+        future = concurrent.futures.Future()
+        if not images:
+            future.set_result([])
+            return future
+        request = {"future": future, "results": [None] * len(images), "remaining": len(images)}
+        now = time.monotonic()
+        with self.condition:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True, name="inference-scheduler")
+                self.thread.start()
+            self.queue.extend((image, request, i, now) for i, image in enumerate(images))
+            self.condition.notify()
+        return future
+
+    def next_batch(self):
+        with self.condition:
+            while not self.queue:
+                self.condition.wait()
+            deadline = self.queue[0][3] + self.max_wait
+            while len(self.queue) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            return [self.queue.popleft() for _ in range(min(len(self.queue), self.max_batch_size))]
+
+    def run(self):
+        while True:
+            batch = self.next_batch()
+            started = time.monotonic()
+            try:
+                outputs, error = self.infer([item[0] for item in batch]), None
+            except Exception as e:
+                outputs, error = [None] * len(batch), e
+                print(f"❌ Inference batch of {len(batch)} failed: {e}")
+            with self.condition:
+                self.batches += 1
+                self.images += len(batch)
+                self.batch_sizes.append(len(batch))
+                self.waits.extend(started - item[3] for item in batch)
+            for (_, request, index, _), output in zip(batch, outputs):
+                if request["future"].done():
+                    continue
+                if error is not None:
+                    request["future"].set_exception(error)
+                    continue
+                request["results"][index] = output
+                request["remaining"] -= 1
+                if request["remaining"] == 0:
+                    request["future"].set_result(request["results"])
+
+    def metrics(self):
+        """Queue depth, batch fill ratio and p50/p99 queueing wait over recent batches"""
+        with self.condition:
+            waits = np.array(self.waits) * 1000.0
+            sizes = np.array(self.batch_sizes)
+            depth = len(self.queue)
+        return {
+            "queue_depth": depth,
+            "batches": self.batches,
+            "images": self.images,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "mean_batch_size": float(sizes.mean()) if len(sizes) else 0.0,
+            "batch_fill_ratio": float(sizes.mean() / self.max_batch_size) if len(sizes) else 0.0,
+            "wait_p50_ms": float(np.percentile(waits, 50)) if len(waits) else 0.0,
+            "wait_p99_ms": float(np.percentile(waits, 99)) if len(waits) else 0.0,
+        }
+
+inference_scheduler = InferenceScheduler(clip_label_probs) if INFERENCE_SCHEDULER_ENABLED else None
+
+def frame_dhash(frame):
+    """64-bit difference hash: sign of horizontal gradients on a 9x8 downscaled luma frame"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    return int.from_bytes(np.packbits(small[:, 1:] > small[:, :-1]).tobytes(), "big")
+
+class FrameBatcher:
+    """Collects sampled frames and scores them CLIP_BATCH_SIZE at a time; results stay in frame order.
+
+    With dedup, a frame within max_hamming of the last frame sent to CLIP gets a copy of that
+    frame's result (frame_num updated, reused_from set) instead of a model pass.
+    """
+
+    def __init__(self, batch_size=CLIP_BATCH_SIZE, stats=None, dedup=FRAME_DEDUP_ENABLED,
+                 max_hamming=FRAME_DEDUP_MAX_HAMMING):
+        self.batch_size = batch_size
+        self.stats = stats
+        self.max_hamming = max_hamming if dedup else -1
+        self.frames = []
+        self.frame_nums = []
+        self.slots = []  # results index of each pending frame
+        self.reused = []  # (results index, source results index) waiting for the source's result
+        self.results = []
+        self.last_hash = None
+        self.last_slot = None
+        self.scored_count = 0
+        self.reused_count = 0
+
+    async def add(self, frame, frame_num):
+        if self.max_hamming >= 0:
+            frame_hash = frame_dhash(frame)
+            if self.last_hash is not None and bin(frame_hash ^ self.last_hash).count("1") <= self.max_hamming:
+                self.results.append({"frame_num": frame_num})
+                self.reused.append((len(self.results) - 1, self.last_slot))
+                self.reused_count += 1
+                return
+            self.last_hash, self.last_slot = frame_hash, len(self.results)
+        self.results.append(None)
+        self.slots.append(len(self.results) - 1)
+        self.frames.append(frame)
+        self.frame_nums.append(frame_num)
+        if len(self.frames) >= self.batch_size:
+            await self.score_pending()
+
+    async def score_pending(self):
+        if self.frames:
+            scored = await analyze_frames_with_ai(self.frames, self.frame_nums, self.stats)
+            for slot, result in zip(self.slots, scored):
+                self.results[slot] = result
+            self.scored_count += len(scored)
+            self.frames, self.frame_nums, self.slots = [], [], []
+        waiting = []
+        for slot, source in self.reused:
+            if self.results[source] is None:
+                waiting.append((slot, source))
+            else:
+                self.results[slot] = dict(self.results[source], frame_num=self.results[slot]["frame_num"],
+                                          reused_from=self.results[source]["frame_num"])
+        self.reused = waiting
+
+    async def flush(self):
+        """Score what is pending; returns the results so far and records scored/reused counts in stats"""
+        await self.score_pending()
+        if self.stats is not None:
+            self.stats["frames_scored"] = self.scored_count
+            self.stats["frames_reused"] = self.reused_count
+        return self.results
+
+async def analyze_video_frames(s3_key, artifact_key=None, stats=None, hints=None):
+    """Score 1 FPS frames of an S3 video in CLIP batches of CLIP_BATCH_SIZE (analyze_frames_with_ai).
+
+    Uses fast-screening's frame artifact when it covers the sampling we need, otherwise
+    fetches the video through local_video and decodes it. With segment hints (and
+    SEGMENT_FOCUS_ENABLED) only the hinted ranges are analyzed at the full rate. With
+    FRAME_DEDUP_ENABLED near-duplicate frames reuse the previous scores (frames_reused in stats).
+    """
+    plan = SamplePlan(hints)
+    if stats is not None:
+        stats["inference_batch_size"] = CLIP_BATCH_SIZE
+    batcher = FrameBatcher(stats=stats)
+    if artifact_key and FRAME_ARTIFACTS_ENABLED:
+        loaded = load_frame_artifact(artifact_key)
+        if loaded is not None and artifact_covers(loaded[0]):
+            metadata, bundle = loaded
+            for frame_num, t, frame in iter_artifact_frames(bundle, metadata, wants=plan.wants):
+                await batcher.add(frame, frame_num)
+                plan.analyzed.append(t)
+            if stats is not None:
+                stats["frame_source"] = "artifact"
+            plan.record(stats)
+            return await batcher.flush()
+        print(f"ℹ️  Frame artifact {artifact_key} does not cover {DEEP_SAMPLE_INTERVAL_SECONDS}s sampling, decoding")
+
+    if stats is not None:
+        stats["frame_source"] = "decode"
+    with local_video(S3_BUCKET, s3_key) as local_path:
+        cap = open_video(local_path, output_max_height=DECODER_OUTPUT_MAX_HEIGHT)
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        interval = int(fps) if fps > 0 else 30  # 1 FPS for GPU
+        count = 0
+        try:
+            # grab() skips the BGR conversion for frames that are not analyzed
+            while cap.grab():
+                # Every int(fps) frames is not exactly one second (29.97 fps): use the frame's real time
+                t = count / fps if fps > 0 else count / 30
+                if count % interval == 0 and plan.wants(count // interval, t):
+                    ret, frame = cap.retrieve()
+                    if not ret:
+                        break
+                    await batcher.add(frame, count // interval)
+                    plan.analyzed.append(t)
+                count += 1
+            await batcher.flush()
+        finally:
+            cap.release()
+    plan.record(stats)
+    return batcher.results
+
 @app.post("/analyze")
 async def analyze_video(video_id: str, background_tasks: BackgroundTasks):
     """Deep analysis with CLIP and Azure OpenAI (CPU/GPU agnostic)"""
-    # Download video from S3
+    # Fetch video from S3 (or the node-local cache) and analyze it
     s3_key = f"videos/{video_id}.mp4"
-    local_path = f"/tmp/{video_id}.mp4"
-    
+    analysis_stats = {}
     try:
-        s3_client.download_file(S3_BUCKET, s3_key, local_path)
+        frames_data = await analyze_video_frames(s3_key, stats=analysis_stats)
     except ClientError as e:
         raise HTTPException(404, f"Video not found in S3: {str(e)}")
     
-    cap = cv2.VideoCapture(local_path)
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    interval = int(fps)  # 1 FPS for GPU
-    
-    frames_data = []
-    count = 0
-    
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-        if count % interval == 0:
-            frame_analysis = await analyze_frame_with_ai(frame, count // interval)
-            frames_data.append(frame_analysis)
-        count += 1
-    
-    cap.release()
-    
     # Aggregate scores (CRITICAL PATH - deterministic ML inference)
     nsfw_scores = [f["nsfw_score"] for f in frames_data]
     violence_scores = [f["violence_score"] for f in frames_data]
@@ -122,14 +547,18 @@ async def analyze_video(video_id: str, background_tasks: BackgroundTasks):
     try:
         videos_table.update_item(
             Key={"video_id": video_id},
-            UpdateExpression="SET nsfw_score = :nsfw, violence_score = :violence, screening_type = :type, analyzed_at = :timestamp, frames_analyzed = :frames, model_version = :version",
+            UpdateExpression="SET nsfw_score = :nsfw, violence_score = :violence, screening_type = :type, analyzed_at = :timestamp, frames_analyzed = :frames, model_version = :version, inference_batch_size = :batch_size, inference_seconds = :inference_seconds, frames_scored = :frames_scored, frames_reused = :frames_reused",
             ExpressionAttributeValues={
                 ":nsfw": Decimal(str(nsfw_avg)),
                 ":violence": Decimal(str(violence_avg)),
                 ":type": "cpu",
                 ":timestamp": datetime.utcnow().isoformat(),
                 ":frames": len(frames_data),
-                ":version": os.getenv("MODEL_VERSION", "v1.0.0")
+                ":version": os.getenv("MODEL_VERSION", "v1.0.0"),
+                ":batch_size": CLIP_BATCH_SIZE,
+                ":inference_seconds": Decimal(str(round(analysis_stats.get("inference_seconds", 0.0), 3))),
+                ":frames_scored": analysis_stats.get("frames_scored", len(frames_data)),
+                ":frames_reused": analysis_stats.get("frames_reused", 0)
             }
         )
         
@@ -146,12 +575,6 @@ async def analyze_video(video_id: str, background_tasks: BackgroundTasks):
     except ClientError as e:
         print(f"Failed to update DynamoDB: {e}")
     
-    # Clean up local file
-    try:
-        os.remove(local_path)
-    except:
-        pass
-    
     # Trigger policy engine decision with risk_score from fast-screening + deep-vision scores
     try:
         video_resp = videos_table.get_item(Key={"video_id": video_id})
@@ -183,59 +606,43 @@ async def analyze_video(video_id: str, background_tasks: BackgroundTasks):
         "nsfw_score": nsfw_avg,
         "violence_score": violence_avg,
         "frames_analyzed": len(frames_data),
+        "inference_batch_size": CLIP_BATCH_SIZE,
+        "inference_seconds": analysis_stats.get("inference_seconds", 0.0),
+        "frames_scored": analysis_stats.get("frames_scored", len(frames_data)),
+        "frames_reused": analysis_stats.get("frames_reused", 0),
         "explanation_available": AZURE_OPENAI_ENABLED
     }
 
 async def analyze_frame_with_ai(frame, frame_num):
     """Analyve frame using improved CLIP-based detection (works without external model endpoints)"""
-    img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-    
-    # First, detect if content is animated/cartoon (to reduce false positives)
-    animation_labels = [
-        "real life video, live action, actual people, real world",
-        "animated cartoon, animation, drawn characters, animated content",
-        "computer graphics, CGI, digital animation, rendered content"
-    ]
-    
-    animation_inputs = clip_processor(text=animation_labels, images=img, return_tensors="pt", padding=True).to(device)
-    with torch.no_grad():
-        animation_outputs = clip_model(**animation_inputs)
-        animation_logits = animation_outputs.logits_per_image
-        animation_probs = animation_logits.softmax(dim=1).cpu().numpy()[0]
-    
+    return (await analyze_frames_with_ai([frame], [frame_num]))[0]
+
+async def analyze_frames_with_ai(frames, frame_nums, stats=None):
+    """Score a batch of frames with one CLIP forward pass; one analyze_frame_with_ai result dict per frame.
+
+    With the inference scheduler the frames may share a forward pass with other callers' frames.
+    Accumulates inference_batches, inference_frames and inference_seconds (CLIP time, including
+    scheduler queueing) in stats.
+    """
+    images = [Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)) for frame in frames]
+    start = time.perf_counter()
+    if inference_scheduler:
+        batch_probs = await asyncio.wrap_future(inference_scheduler.submit(images))
+    else:
+        batch_probs = clip_label_probs(images)
+    if stats is not None:
+        stats["inference_batches"] = stats.get("inference_batches", 0) + 1
+        stats["inference_frames"] = stats.get("inference_frames", 0) + len(images)
+        stats["inference_seconds"] = stats.get("inference_seconds", 0.0) + time.perf_counter() - start
+    return [await score_frame(img, frame_num, probs) for img, frame_num, probs in zip(images, frame_nums, batch_probs)]
+
+async def score_frame(img, frame_num, probs):
+    """Frame result dict from its CLIP label probabilities (plus custom model endpoints when configured)"""
+    animation_probs, nsfw_probs, violence_probs = probs["animation"], probs["nsfw"], probs["violence"]
+
     # Check if content is animated (probability of animated/cartoon/CGI)
     is_animated = float(animation_probs[1] + animation_probs[2]) > 0.5
     
-    # Enhanced CLIP-based content classification with better prompts
-    # More specific labels for better accuracy
-    nsfw_labels = [
-        "safe content, normal scene, everyday activity",
-        "explicit sexual content, adult material, pornography",
-        "partial nudity, revealing clothing, suggestive content",
-        "naked person, full nudity, exposed body parts"
-    ]
-    
-    violence_labels = [
-        "safe content, peaceful scene, normal activity",
-        "violence, fighting, physical assault, combat",
-        "weapons, guns, knives, firearms, dangerous objects",
-        "blood, injury, wound, gore, violence aftermath"
-    ]
-    
-    # Analyze NSFW content
-    nsfw_inputs = clip_processor(text=nsfw_labels, images=img, return_tensors="pt", padding=True).to(device)
-    with torch.no_grad():
-        nsfw_outputs = clip_model(**nsfw_inputs)
-        nsfw_logits = nsfw_outputs.logits_per_image
-        nsfw_probs = nsfw_logits.softmax(dim=1).cpu().numpy()[0]
-    
-    # Analyze Violence content
-    violence_inputs = clip_processor(text=violence_labels, images=img, return_tensors="pt", padding=True).to(device)
-    with torch.no_grad():
-        violence_outputs = clip_model(**violence_inputs)
-        violence_logits = violence_outputs.logits_per_image
-        violence_probs = violence_logits.softmax(dim=1).cpu().numpy()[0]
-    
     # Calculate NSFW score (explicit + partial nudity + full nudity)
     clip_nsfw = float(nsfw_probs[1] + nsfw_probs[2] * 0.7 + nsfw_probs[3])
     
@@ -405,12 +812,20 @@ Provide a clear explanation suitable for content creators."""
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/metrics/inference")
+async def inference_metrics():
+    """Micro-batching scheduler metrics (queue depth, batch fill ratio, p50/p99 wait)"""
+    if not inference_scheduler:
+        return {"enabled": False}
+    return {"enabled": True, **inference_scheduler.metrics()}
+
 @app.get("/health")
 async def health():
     return {
         "status": "healthy",
         "device": str(device),
         "models": ["CLIP", "Custom NSFW", "Custom Violence"],
+        "inference_backend": vision_encoder.name,
         "llm_explanation_enabled": AZURE_OPENAI_ENABLED and client is not None
     }
 
@@ -444,42 +859,25 @@ async def poll_gpu_queue():
                     body = json.loads(message['Body'])
                     video_id = body.get('video_id')
                     s3_key = body.get('s3_key', f"videos/{video_id}.mp4")
+                    artifact_key = body.get('frame_artifact_key')
                     
                     print(f"🎬 Deep analyzing video: {video_id}")
                     
-                    # Download video from S3
-                    local_path = f"/tmp/{video_id}.mp4"
-                    s3_client.download_file(S3_BUCKET, s3_key, local_path)
-                    
-                    # Process video with CLIP
-                    cap = cv2.VideoCapture(local_path)
-                    fps = cap.get(cv2.CAP_PROP_FPS)
-                    interval = int(fps) if fps > 0 else 30
-                    
-                    frames_data = []
-                    count = 0
-                    
-                    while cap.isOpened():
-                        ret, frame = cap.read()
-                        if not ret:
-                            break
-                        if count % interval == 0:
-                            # Use improved analyze_frame_with_ai function
-                            frame_analysis = await analyze_frame_with_ai(frame, count // interval)
-                            frames_data.append(frame_analysis)
-                        
-                        count += 1
-                    
-                    cap.release()
-                    os.unlink(local_path)
+                    # Use fast-screening's frame artifact, or fetch the video (node-local cache or
+                    # temp file, always cleaned up), and process with CLIP
+                    analysis_stats = {}
+                    frames_data = await analyze_video_frames(s3_key, artifact_key, analysis_stats,
+                                                             body.get('segment_hints'))
                     
                     # Calculate aggregate scores using improved method
                     nsfw_scores = [f["nsfw_score"] for f in frames_data]
                     violence_scores = [f["violence_score"] for f in frames_data]
                     
                     # Use 90th percentile to catch more content while reducing false positives
-                    nsfw_avg = float(np.percentile(nsfw_scores, 90)) if nsfw_scores else 0.0
-                    violence_avg = float(np.percentile(violence_scores, 90)) if violence_scores else 0.0
+                    # (time-weighted when segment-focused sampling skipped part of the video)
+                    sample_weights = analysis_stats.get("sample_weights")
+                    nsfw_avg = percentile_90(nsfw_scores, sample_weights)
+                    violence_avg = percentile_90(violence_scores, sample_weights)
                     
                     # Light scaling only if custom models are not available
                     has_custom_models = any(f.get("custom_nsfw", 0) > 0 or f.get("custom_violence", 0) > 0 for f in frames_data)
@@ -493,7 +891,7 @@ async def poll_gpu_queue():
                     # Update DynamoDB
                     videos_table.update_item(
                         Key={"video_id": video_id},
-                        UpdateExpression="SET nsfw_score = :nsfw, violence_score = :violence, final_score = :final, #status = :status, analyzed_at = :timestamp, frames_analyzed = :frames, model_version = :version",
+                        UpdateExpression="SET nsfw_score = :nsfw, violence_score = :violence, final_score = :final, #status = :status, analyzed_at = :timestamp, frames_analyzed = :frames, model_version = :version, inference_batch_size = :batch_size, inference_seconds = :inference_seconds, frames_scored = :frames_scored, frames_reused = :frames_reused",
                         ExpressionAttributeNames={"#status": "status"},
                         ExpressionAttributeValues={
                             ":nsfw": Decimal(str(nsfw_avg)),
@@ -502,7 +900,11 @@ async def poll_gpu_queue():
                             ":status": "analyzed",
                             ":timestamp": datetime.utcnow().isoformat(),
                             ":frames": len(frames_data),
-                            ":version": "clip-vit-base-patch32"
+                            ":version": "clip-vit-base-patch32",
+                            ":batch_size": CLIP_BATCH_SIZE,
+                            ":inference_seconds": Decimal(str(round(analysis_stats.get("inference_seconds", 0.0), 3))),
+                            ":frames_scored": analysis_stats.get("frames_scored", len(frames_data)),
+                            ":frames_reused": analysis_stats.get("frames_reused", 0)
                         }
                     )
                     
@@ -518,13 +920,28 @@ async def poll_gpu_queue():
                                 "final_score": str(final_score),
                                 "frames_analyzed": len(frames_data),
                                 "model": "clip-vit-base-patch32",
-                                "device": str(device)
+                                "inference_backend": vision_encoder.name,
+                                "device": str(device),
+                                "frame_source": analysis_stats.get("frame_source"),
+                                "analysis_mode": analysis_stats.get("analysis_mode"),
+                                "inference_batch_size": CLIP_BATCH_SIZE,
+                                "inference_batches": analysis_stats.get("inference_batches", 0),
+                                "inference_seconds": str(round(analysis_stats.get("inference_seconds", 0.0), 3)),
+                                "frames_scored": analysis_stats.get("frames_scored", len(frames_data)),
+                                "frames_reused": analysis_stats.get("frames_reused", 0)
                             },
                             "timestamp": datetime.utcnow().isoformat(),
                             "ttl": int(datetime.utcnow().timestamp()) + (90 * 24 * 60 * 60)
                         }
                     )
                     
+                    # The artifact was only needed for this analysis
+                    if artifact_key:
+                        try:
+                            s3_client.delete_object(Bucket=S3_BUCKET, Key=artifact_key)
+                        except ClientError as e:
+                            print(f"⚠️  Failed to delete frame artifact {artifact_key} (non-critical): {e}")
+                    
                     # Get original risk_score from fast-screening (if available)
                     try:
                         video_resp = videos_table.get_item(Key={"video_id": video_id})
@@ -0,0 +1,78 @@
+"""Benchmark CLIP vision backends: eager PyTorch FP32 vs ONNX Runtime FP32 / INT8.
+
+Scores a fixed set of frames (synthetic, or sampled from the given videos) with each backend at
+each batch size and reports frames/s, per-batch latency (p50/p95) and deltas against eager FP32:
+max |Δprob| over all label groups, max |Δscore| on the nsfw/violence frame scores, and how many
+frames flip is_animated. Export the ONNX models first with export_onnx_vision.py.
+
+Usage:
+    python benchmark_inference_backends.py --onnx-dir onnx_models
+    python benchmark_inference_backends.py --onnx-dir onnx_models --batch-sizes 1 8 32 --frames 64 video.mp4
+"""
+import argparse
+import os
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from app import CLIP_LABEL_GROUPS, OnnxVisionEncoder, TorchVisionEncoder, clip_label_probs
+from parity_clip_scores import reference_scores, synthetic_frames, video_frames
+
+
+def score_all(encoder, images, batch_size):
+    """(label probabilities per image, per-batch latencies in seconds)"""
+    probs, latencies = [], []
+    for i in range(0, len(images), batch_size):
+        start = time.perf_counter()
+        probs += clip_label_probs(images[i:i + batch_size], encoder=encoder)
+        latencies.append(time.perf_counter() - start)
+    return probs, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("videos", nargs="*", help="Videos to sample frames from (default: synthetic frames)")
+    parser.add_argument("--onnx-dir", default="onnx_models", help="Directory written by export_onnx_vision.py")
+    parser.add_argument("--frames", type=int, default=64, help="Frames per video")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 32])
+    parser.add_argument("--threads", type=int, default=0, help="ONNX Runtime intra-op threads (0 = default)")
+    args = parser.parse_args()
+
+    frames = [f for path in args.videos for f in video_frames(path, args.frames)] or \
+        list(synthetic_frames(args.frames))
+    images = [Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)) for frame in frames]
+
+    backends = [("torch-fp32", TorchVisionEncoder())]
+    for name, filename in (("onnx-fp32", "clip-vision-fp32.onnx"), ("onnx-int8", "clip-vision-int8.onnx")):
+        path = os.path.join(args.onnx_dir, filename)
+        if os.path.exists(path):
+            backends.append((name, OnnxVisionEncoder(path, intra_op_threads=args.threads)))
+        else:
+            print(f"⚠️  {path} not found, skipping {name}")
+
+    # Eager FP32 at batch size 1 is the reference every other run is compared with
+    baseline, _ = score_all(backends[0][1], images, 1)
+    baseline_scores = [reference_scores(p) for p in baseline]
+
+    print(f"{len(images)} frames, {os.cpu_count()} CPUs visible")
+    print(f"{'backend':<11} {'batch':>5} {'frames/s':>9} {'p50_ms':>8} {'p95_ms':>8} {'max|Δprob|':>11} "
+          f"{'max|Δscore|':>12} {'animated_flips':>14}")
+    for name, encoder in backends:
+        score_all(encoder, images[:max(args.batch_sizes)], max(args.batch_sizes))  # warm-up
+        for batch_size in args.batch_sizes:
+            probs, latencies = score_all(encoder, images, batch_size)
+            scores = [reference_scores(p) for p in probs]
+            prob_delta = max(float(np.max(np.abs(p[g] - b[g]))) for p, b in zip(probs, baseline)
+                             for g in CLIP_LABEL_GROUPS)
+            score_delta = max(max(abs(s["nsfw_score"] - b["nsfw_score"]), abs(s["violence_score"] - b["violence_score"]))
+                              for s, b in zip(scores, baseline_scores))
+            flips = sum(s["is_animated"] != b["is_animated"] for s, b in zip(scores, baseline_scores))
+            print(f"{name:<11} {batch_size:>5} {len(images) / sum(latencies):>9.1f} "
+                  f"{np.percentile(latencies, 50) * 1000:>8.1f} {np.percentile(latencies, 95) * 1000:>8.1f} "
+                  f"{prob_delta:>11.2e} {score_delta:>12.2e} {flips:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Export the CLIP vision tower (vision model + projection) to ONNX and quantize it to INT8.
+
+Writes an FP32 model and a dynamically quantized copy (INT8 MatMul weights; the patch-embedding
+convolution stays FP32), both with a dynamic batch axis, and checks them against eager PyTorch on
+random inputs. Deep-vision loads the result with INFERENCE_BACKEND=onnx.
+
+Usage:
+    python export_onnx_vision.py --output-dir onnx_models
+    python export_onnx_vision.py --upload models/onnx/clip-vision-int8.onnx   # then set ONNX_VISION_MODEL_S3_KEY
+"""
+import argparse
+import os
+
+import boto3
+import numpy as np
+import onnxruntime as ort
+import torch
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from transformers import CLIPModel
+
+
+class VisionTower(torch.nn.Module):
+    """pixel_values -> image embeddings, exactly CLIPModel.get_image_features"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.vision_model = model.vision_model
+        self.visual_projection = model.visual_projection
+
+    def forward(self, pixel_values):
+        pooled = self.vision_model(pixel_values=pixel_values).pooler_output
+        return self.visual_projection(pooled)
+
+
+def export(model_name, output_dir, opset):
+    model = CLIPModel.from_pretrained(model_name).eval()
+    tower = VisionTower(model).eval()
+    size = model.config.vision_config.image_size
+    fp32_path = os.path.join(output_dir, "clip-vision-fp32.onnx")
+    int8_path = os.path.join(output_dir, "clip-vision-int8.onnx")
+
+    torch.onnx.export(
+        tower, torch.randn(1, 3, size, size), fp32_path,
+        input_names=["pixel_values"], output_names=["image_embeds"],
+        dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+        opset_version=opset, do_constant_folding=True,
+    )
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8, op_types_to_quantize=["MatMul"])
+
+    # Sanity check against eager FP32 (cosine similarity of the embeddings the scores are built from)
+    pixel_values = torch.randn(4, 3, size, size)
+    with torch.no_grad():
+        expected = model.get_image_features(pixel_values=pixel_values).numpy()
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+    for path in (fp32_path, int8_path):
+        session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+        actual = session.run(None, {"pixel_values": pixel_values.numpy()})[0]
+        actual /= np.linalg.norm(actual, axis=1, keepdims=True)
+        cosine = float(np.min(np.sum(expected * actual, axis=1)))
+        print(f"✅ {path}: {os.path.getsize(path) / 1e6:.1f} MB, min cosine vs eager FP32 {cosine:.5f}")
+    return fp32_path, int8_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="openai/clip-vit-base-patch32")
+    parser.add_argument("--output-dir", default="onnx_models")
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--upload", help="S3 key to upload the INT8 model to (bucket from S3_BUCKET_NAME)")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    _, int8_path = export(args.model, args.output_dir, args.opset)
+    if args.upload:
+        bucket = os.getenv("S3_BUCKET_NAME", "guardian-videos")
+        boto3.client("s3", region_name=os.getenv("AWS_REGION", "us-west-2")).upload_file(int8_path, bucket, args.upload)
+        print(f"📤 Uploaded {int8_path} to s3://{bucket}/{args.upload}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Parity check: cached text embeddings + one image encode vs the per-group CLIP calls.
+
+The reference path is the original one: a full clip_model(text=group, images=img) call per label
+group, re-tokenizing and re-encoding the prompts and the image each time. The frames are also
+scored in batches of --batch-size through analyze_frames_with_ai. Exits non-zero if any label
+probability differs by more than --tolerance, or if the per-frame or batched scores / is_animated
+flags differ from the ones the reference probabilities give.
+
+Usage:
+    python parity_clip_scores.py                      # 32 synthetic frames
+    python parity_clip_scores.py --frames 64 video.mp4
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+import cv2
+import numpy as np
+import torch
+from PIL import Image
+
+from app import (CLIP_BATCH_SIZE, CLIP_LABEL_GROUPS, analyze_frame_with_ai, analyze_frames_with_ai, clip_label_probs,
+                 clip_model, clip_processor, device)
+
+
+def reference_probs(img):
+    """Original path: one full CLIP forward pass (text + image) per label group"""
+    probs = {}
+    for name, labels in CLIP_LABEL_GROUPS.items():
+        inputs = clip_processor(text=labels, images=img, return_tensors="pt", padding=True).to(device)
+        with torch.no_grad():
+            probs[name] = clip_model(**inputs).logits_per_image.softmax(dim=1).cpu().numpy()[0]
+    return probs
+
+
+def reference_scores(probs):
+    """The CLIP-only scoring of analyze_frame_with_ai (no custom endpoints)"""
+    is_animated = float(probs["animation"][1] + probs["animation"][2]) > 0.5
+    clip_nsfw = float(probs["nsfw"][1] + probs["nsfw"][2] * 0.7 + probs["nsfw"][3])
+    clip_violence = float(probs["violence"][1] + probs["violence"][2] * 0.8 + probs["violence"][3] * 0.9)
+    nsfw, violence = clip_nsfw * 0.85, clip_violence * 0.85
+    if is_animated:
+        nsfw, violence = nsfw * 0.2, violence * 0.25
+    return {"nsfw_score": float(np.clip(nsfw, 0.0, 1.0)), "violence_score": float(np.clip(violence, 0.0, 1.0)),
+            "is_animated": is_animated}
+
+
+def scores_match(result, scores, tolerance):
+    return result["is_animated"] == scores["is_animated"] and \
+        abs(result["nsfw_score"] - scores["nsfw_score"]) <= tolerance and \
+        abs(result["violence_score"] - scores["violence_score"]) <= tolerance
+
+
+def synthetic_frames(count, seed=0):
+    """Random gradients, blocks and noise: enough variety to exercise every label"""
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        frame = np.linspace(0, 255, 320 * 3, dtype=np.float32).reshape(1, 320, 3) * rng.random(3)
+        frame = np.repeat(frame, 240, axis=0)
+        for _ in range(rng.integers(1, 6)):
+            x, y = rng.integers(0, 280), rng.integers(0, 200)
+            frame[y:y + 40, x:x + 40] = rng.integers(0, 256, 3)
+        frame += rng.normal(0, 12, frame.shape)
+        yield np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def video_frames(path, count):
+    cap = cv2.VideoCapture(path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or count
+    for index in np.linspace(0, total - 1, count).astype(int):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+        ret, frame = cap.read()
+        if ret:
+            yield frame
+    cap.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("videos", nargs="*", help="Videos to sample frames from (default: synthetic frames)")
+    parser.add_argument("--frames", type=int, default=32, help="Frames per video")
+    parser.add_argument("--batch-size", type=int, default=CLIP_BATCH_SIZE, help="Frames per batched forward pass")
+    parser.add_argument("--tolerance", type=float, default=1e-4, help="Max abs difference per probability")
+    args = parser.parse_args()
+
+    frames = [f for path in args.videos for f in video_frames(path, args.frames)] or \
+        list(synthetic_frames(args.frames))
+    max_diff, mismatches = 0.0, 0
+    reference_s = cached_s = 0.0
+    expected_scores = []
+    for frame_num, frame in enumerate(frames):
+        img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        start = time.perf_counter()
+        expected = reference_probs(img)
+        reference_s += time.perf_counter() - start
+        start = time.perf_counter()
+        actual = clip_label_probs([img])[0]
+        cached_s += time.perf_counter() - start
+
+        max_diff = max(max_diff, max(float(np.max(np.abs(expected[g] - actual[g]))) for g in CLIP_LABEL_GROUPS))
+        expected_scores.append(reference_scores(expected))
+        if not scores_match(asyncio.run(analyze_frame_with_ai(frame, frame_num)), expected_scores[-1], args.tolerance):
+            mismatches += 1
+
+    stats = {}
+    batched = []
+    for i in range(0, len(frames), args.batch_size):
+        batched += asyncio.run(analyze_frames_with_ai(frames[i:i + args.batch_size],
+                                                      list(range(i, min(i + args.batch_size, len(frames)))), stats))
+    batch_mismatches = sum(not scores_match(result, scores, args.tolerance)
+                           for result, scores in zip(batched, expected_scores))
+
+    ok = max_diff <= args.tolerance and mismatches == 0 and batch_mismatches == 0
+    print(f"{'✅' if ok else '❌'} {len(frames)} frames: max |Δprob|={max_diff:.2e}, score mismatches={mismatches}, "
+          f"batched mismatches={batch_mismatches}")
+    print(f"   reference {reference_s / len(frames) * 1000:.1f} ms/frame, cached {cached_s / len(frames) * 1000:.1f} "
+          f"ms/frame, batch of {args.batch_size} {stats['inference_seconds'] / len(frames) * 1000:.1f} ms/frame")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,14 +12,46 @@ import asyncio
 import threading
 import tempfile
 import time
+import shutil
+import struct
+import base64
+import io
+import hashlib
+import contextlib
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 import httpx
 import requests
 
+try:
+    import video_io  # services/shared modules are copied next to app.py in the image
+except ImportError:  # running from the source tree
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+    import video_io
+from screening_features import (FEATURE_COLUMNS, VIOLENT_KEYWORDS, SCREENING_MODEL_FEATURES, features_to_matrix,
+                                 calculate_risk_score, screening_feature_vector)
+from video_io import (DECODER_BACKEND, DECODER_BACKENDS, DECODER_LOWRES, PyAVCapture, open_video,
+                      s3_transfer_config, download_s3_object, video_cache, local_video)
+
 app = FastAPI()
 
 POLICY_ENGINE_URL = os.getenv("POLICY_ENGINE_SERVICE_URL", "http://policy-engine-service:80")
 cache = redis.Redis(host=os.getenv("REDIS_HOST", "redis"), port=6379, decode_responses=True)
 
+# Shared, pooled HTTP clients for policy engine calls: async for /screen, sync for the SQS worker thread
+policy_client = httpx.AsyncClient(
+    timeout=10.0,
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+)
+policy_session = requests.Session()
+
+# /screen runs decoding here so the event loop (and /health) stays responsive
+SCREEN_ENDPOINT_WORKERS = int(os.getenv("SCREEN_ENDPOINT_WORKERS", "2"))
+screen_executor = ThreadPoolExecutor(max_workers=SCREEN_ENDPOINT_WORKERS)
+
 # AWS Configuration
 AWS_REGION = os.getenv("AWS_REGION", "us-west-2")
 DYNAMODB_VIDEOS_TABLE = os.getenv("DYNAMODB_VIDEOS_TABLE", "guardian-videos")
@@ -35,28 +67,125 @@ events_table = dynamodb.Table(DYNAMODB_EVENTS_TABLE)
 sqs_client = boto3.client('sqs', region_name=AWS_REGION)
 s3_client = boto3.client('s3', region_name=AWS_REGION)
 
+# Frame sampling configuration
+SAMPLE_INTERVAL_SECONDS = float(os.getenv("SAMPLE_INTERVAL_SECONDS", "2.0"))  # 0.5 FPS sampling
+# "exact": grab() (decode) every frame, only convert sampled frames to BGR (frame-accurate stride)
+# "seek": jump to the keyframe at or before each sample point and decode only that frame (PyAV decoder;
+#         a sample can be up to one keyframe interval early, see max_seek_offset_seconds)
+# "adaptive": dense around scene changes, sparse in static stretches, within a per-minute budget
+SAMPLING_MODE = os.getenv("SAMPLING_MODE", "exact")
+SAMPLING_MODES = ("exact", "seek", "adaptive")
+# Adaptive sampling: a 32x18 luma thumbnail is compared every probe interval to find shot boundaries
+ADAPTIVE_PROBE_SECONDS = float(os.getenv("ADAPTIVE_PROBE_SECONDS", "0.5"))
+ADAPTIVE_SCENE_THRESHOLD = float(os.getenv("ADAPTIVE_SCENE_THRESHOLD", "12.0"))  # mean abs luma diff (0-255)
+ADAPTIVE_DENSE_SECONDS = float(os.getenv("ADAPTIVE_DENSE_SECONDS", "3.0"))  # sample every probe this long after a cut
+ADAPTIVE_SPARSE_SECONDS = float(os.getenv("ADAPTIVE_SPARSE_SECONDS", "8.0"))  # max gap between samples when static
+ADAPTIVE_FRAMES_PER_MINUTE = int(os.getenv("ADAPTIVE_FRAMES_PER_MINUTE", "30"))  # same budget as 0.5 FPS
+ADAPTIVE_BURST_FRAMES = int(os.getenv("ADAPTIVE_BURST_FRAMES", "8"))  # budget that can be spent at once on a cut
+# Frames taller than this are downscaled once right after decode (0 = analyze at native resolution).
+# This only saves feature-extraction time; the decode itself stays full-size unless DECODER_LOWRES applies.
+ANALYSIS_MAX_HEIGHT = int(os.getenv("ANALYSIS_MAX_HEIGHT", "720"))
+
+# Video decoder (DECODER_BACKEND, DECODER_THREADS, DECODER_LOWRES, ...) is configured in video_io.
+# pyav: scale to ANALYSIS_MAX_HEIGHT during the BGR conversion instead of resizing afterwards
+DECODER_SCALED_OUTPUT = os.getenv("DECODER_SCALED_OUTPUT", "true").lower() == "true"
+
+# Feature extraction configuration
+FEATURE_BATCH_SIZE = int(os.getenv("FEATURE_BATCH_SIZE", "8"))  # sampled frames per vectorized batch
+FEATURE_STORE_CAPACITY = int(os.getenv("FEATURE_STORE_CAPACITY", "512"))  # initial rows per worker thread store
+FEATURE_EXPORT_ENABLED = os.getenv("FEATURE_EXPORT_ENABLED", "true").lower() == "true"
+FEATURES_S3_PREFIX = os.getenv("FEATURES_S3_PREFIX", "features/")  # features/{video_id}.npy for downstream stages
+
+# Risk score above which a video is escalated to deep-vision (GPU queue)
+RISK_ESCALATION_THRESHOLD = float(os.getenv("RISK_ESCALATION_THRESHOLD", "0.15"))
+
+# Learned escalation classifier (mlops/training/train_screening_classifier.py). The pointer object names the
+# current versioned model; it is re-checked by ETag and hot-swapped. Without a model the rule above applies.
+SCREENING_MODEL_ENABLED = os.getenv("SCREENING_MODEL_ENABLED", "true").lower() == "true"
+SCREENING_MODEL_POINTER_KEY = os.getenv("SCREENING_MODEL_POINTER_KEY", "models/screening/latest.json")
+SCREENING_MODEL_POLL_SECONDS = float(os.getenv("SCREENING_MODEL_POLL_SECONDS", "300"))
+
+# Backlog-aware escalation: raise the escalation threshold (by at most ESCALATION_MAX_BOOST) while the GPU
+# queue's estimated drain time exceeds ESCALATION_TARGET_DELAY_SECONDS, and lower it again once it recovers
+ESCALATION_CONTROL_ENABLED = os.getenv("ESCALATION_CONTROL_ENABLED", "true").lower() == "true"
+ESCALATION_CONTROL_INTERVAL_SECONDS = float(os.getenv("ESCALATION_CONTROL_INTERVAL_SECONDS", "30"))
+ESCALATION_TARGET_DELAY_SECONDS = float(os.getenv("ESCALATION_TARGET_DELAY_SECONDS", "600"))
+ESCALATION_MAX_BOOST = float(os.getenv("ESCALATION_MAX_BOOST", "0.15"))  # safety bound on the threshold raise
+ESCALATION_BOOST_STEP = float(os.getenv("ESCALATION_BOOST_STEP", "0.025"))
+ESCALATION_DRAIN_RATE_PRIOR = float(os.getenv("ESCALATION_DRAIN_RATE_PRIOR", "0.5"))  # videos/s before measured
+
+# Suspicious-segment hints for deep-vision: time ranges where per-frame risk spiked above the video's baseline
+SEGMENT_HINTS_MAX = int(os.getenv("SEGMENT_HINTS_MAX", "5"))
+SEGMENT_HINT_Z = float(os.getenv("SEGMENT_HINT_Z", "2.5"))  # robust z-score (median/MAD) that counts as a spike
+SEGMENT_HINT_PADDING_SECONDS = float(os.getenv("SEGMENT_HINT_PADDING_SECONDS", "2.0"))
+
+# Early exit: stop sampling once the escalation decision can no longer flip
+EARLY_EXIT_ENABLED = os.getenv("EARLY_EXIT_ENABLED", "false").lower() == "true"
+EARLY_EXIT_MIN_FRAMES = int(os.getenv("EARLY_EXIT_MIN_FRAMES", "10"))
+
+def available_cpus():
+    """CPUs this container may use: the cgroup CPU limit when one is set, else the affinity mask"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:  # cgroup v2: "<quota> <period>" or "max <period>"
+            quota, period = f.read().split()
+        if quota != "max":
+            return max(1, int(quota) // int(period))
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as q, open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as p:
+            quota, period = int(q.read()), int(p.read())
+        if quota > 0:
+            return max(1, quota // period)
+    except (OSError, ValueError):
+        pass
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+# Long videos are split into segments screened in parallel (each with its own decoder handle).
+# Inside the SQS worker pool this is capped at available_cpus() // SCREENING_WORKERS per process.
+SEGMENT_WORKERS = int(os.getenv("SEGMENT_WORKERS", "4"))
+SEGMENT_MIN_SECONDS = float(os.getenv("SEGMENT_MIN_SECONDS", "120"))
+
+# S3 input: stream ranged GETs into the decoder through a named pipe instead of
+# downloading to a temp file first (only for MP4s whose moov index precedes mdat)
+S3_STREAMING_ENABLED = os.getenv("S3_STREAMING_ENABLED", "true").lower() == "true"
+S3_STREAM_CHUNK_BYTES = int(os.getenv("S3_STREAM_CHUNK_BYTES", str(4 * 1024 * 1024)))
+S3_STREAM_PREFETCH = int(os.getenv("S3_STREAM_PREFETCH", "2"))  # ranged GETs in flight ahead of the decoder
+S3_STREAM_PROBE_BYTES = 64 * 1024
+
+# Frame artifact: while screening (exact sampling), also keep downscaled JPEG frames at deep-vision's
+# 1 FPS and upload them for videos that are escalated, so deep-vision can skip its own decode.
+# Deep-vision deletes an artifact after analysis; a bucket lifecycle rule expires any it never picks up.
+FRAME_ARTIFACT_ENABLED = os.getenv("FRAME_ARTIFACT_ENABLED", "false").lower() == "true"
+FRAME_ARTIFACT_INTERVAL_SECONDS = float(os.getenv("FRAME_ARTIFACT_INTERVAL_SECONDS", "1.0"))
+FRAME_ARTIFACT_MAX_HEIGHT = int(os.getenv("FRAME_ARTIFACT_MAX_HEIGHT", "360"))
+FRAME_ARTIFACT_JPEG_QUALITY = int(os.getenv("FRAME_ARTIFACT_JPEG_QUALITY", "90"))
+FRAME_ARTIFACT_PREFIX = os.getenv("FRAME_ARTIFACT_PREFIX", "artifacts/frames/")
+
+# Screening result cache (Redis): re-uploads of the same bytes skip download and decode
+SCREENING_CACHE_ENABLED = os.getenv("SCREENING_CACHE_ENABLED", "true").lower() == "true"
+SCREENING_CACHE_TTL_SECONDS = int(os.getenv("SCREENING_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60)))  # 7 days
+
+# SQS screening worker configuration
+SCREENING_WORKERS = int(os.getenv("SCREENING_WORKERS", str(available_cpus())))  # worker processes
+SQS_RECEIVE_BATCH_SIZE = max(1, min(10, int(os.getenv("SQS_RECEIVE_BATCH_SIZE", "10"))))  # SQS allows at most 10
+SQS_VISIBILITY_TIMEOUT = int(os.getenv("SQS_VISIBILITY_TIMEOUT", "300"))  # 5 minutes to process
+SQS_VISIBILITY_MARGIN = int(os.getenv("SQS_VISIBILITY_MARGIN", "60"))  # extend visibility this close to expiry
+SQS_BATCH_MAX_WAIT_SECONDS = float(os.getenv("SQS_BATCH_MAX_WAIT_SECONDS", "1.0"))  # flush partial batches after this
+SQS_BATCH_MAX_ATTEMPTS = int(os.getenv("SQS_BATCH_MAX_ATTEMPTS", "5"))  # per entry, for retryable batch failures
+
 @app.post("/screen")
 async def screen_video(video_path: str):
     """Fast CPU-based screening using classical ML features (no LLM on critical path)"""
-    cap = cv2.VideoCapture(video_path)
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    interval = int(fps * 2)  # 0.5 FPS sampling
-    
-    frame_features = []
-    count = 0
-    
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-        if count % interval == 0:
-            features = extract_frame_features(frame)
-            frame_features.append(features)
-        count += 1
-    
-    cap.release()
+    loop = asyncio.get_running_loop()
+    # Decoding and feature extraction are CPU-bound; keep them off the event loop
+    video_id = video_path.split("/")[-1].replace(".mp4", "")
+    frame_features, sampling_stats = await loop.run_in_executor(screen_executor, screen_local_video, video_path)
     
-    if not frame_features:
+    if len(frame_features) == 0:
         return {"error": "No frames analyzed"}
     
     # Calculate risk score using classical ML features (calibrated to reduce false positives)
@@ -73,68 +202,50 @@ async def screen_video(video_path: str):
                        'shoot', 'shooting', 'attack', 'assault', 'murder', 'death', 'dead']
     has_violent_keyword = any(keyword in filename for keyword in violent_keywords)
     
-    # Force GPU analysis if filename suggests violence OR risk score > 0.15 (lowered from 0.3)
-    needs_gpu = risk_score > 0.15 or has_violent_keyword
+    # Learned model when loaded; otherwise force GPU analysis if filename suggests violence OR risk score > 0.15
+    needs_gpu, model_result, escalation_threshold = await loop.run_in_executor(
+        None, escalation_decision, frame_features, has_violent_keyword)
+    await loop.run_in_executor(None, publish_frame_artifact, sampling_stats, frame_artifact_key(video_id),
+                               needs_gpu and bool(SQS_GPU_QUEUE_URL))
     
-    if has_violent_keyword:
+    if has_violent_keyword and model_result is None:
         print(f"⚠️  Video {video_id} contains violent keywords in filename, forcing GPU analysis")
         # Boost risk score for violent keywords to ensure proper handling
         risk_score = max(risk_score, 0.25)
 
     video_id = video_path.split("/")[-1].replace(".mp4", "")
 
+    features_key = None
+    if FEATURE_EXPORT_ENABLED:
+        features_key = await loop.run_in_executor(None, export_features, video_id, frame_features)
+
     # Update video record in DynamoDB (single source of truth)
     try:
-        videos_table.update_item(
+        await loop.run_in_executor(None, functools.partial(
+            videos_table.update_item,
             Key={"video_id": video_id},
-            UpdateExpression="SET #status = :status, risk_score = :risk_score, screening_type = :screening_type, frames_analyzed = :frames_analyzed, screened_at = :screened_at",
+            UpdateExpression="SET #status = :status, risk_score = :risk_score, screening_type = :screening_type, frames_analyzed = :frames_analyzed, screened_at = :screened_at, screening_model = :screening_model",
             ExpressionAttributeNames={"#status": "status"},
             ExpressionAttributeValues={
                 ":status": "gpu_queued" if needs_gpu else "screened",
                 ":risk_score": Decimal(str(risk_score)),
                 ":screening_type": "cpu",
                 ":frames_analyzed": len(frame_features),
-                ":screened_at": datetime.utcnow().isoformat()
+                ":screened_at": datetime.utcnow().isoformat(),
+                ":screening_model": model_result["model_version"] if model_result else "heuristic"
             }
-        )
+        ))
     except ClientError as e:
         print(f"Failed to update video in DynamoDB: {e}")
 
     # Trigger policy engine for low-risk videos so they get immediate AUTO APPROVE (no GPU analysis)
     if not needs_gpu:
-        # Retry logic: try up to 3 times with exponential backoff
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                import requests
-                response = requests.post(
-                    f"{POLICY_ENGINE_URL}/decide",
-                    json={
-                        "video_id": video_id,
-                        "risk_score": float(risk_score),
-                        "nsfw_score": 0.0,
-                        "violence_score": 0.0,
-                        "hate_speech_score": 0.0,
-                    },
-                    timeout=10.0,
-                )
-                if response.status_code == 200:
-                    print(f"✅ Policy engine triggered for {video_id}: {response.json()}")
-                    break  # Success, exit retry loop
-                else:
-                    print(f"⚠️  Policy engine returned {response.status_code}: {response.text}")
-                    if attempt < max_retries - 1:
-                        time.sleep(2 ** attempt)  # Exponential backoff: 1s, 2s, 4s
-            except Exception as e:
-                print(f"⚠️  Failed to trigger policy for low-risk video (attempt {attempt + 1}/{max_retries}): {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                else:
-                    print(f"❌ All retries failed for {video_id}. Video will be fixed by background worker.")
+        await trigger_policy_engine_async(video_id, risk_score)
     
     # Log screening event to events table
     try:
-        events_table.put_item(
+        await loop.run_in_executor(None, functools.partial(
+            events_table.put_item,
             Item={
                 "event_id": f"{video_id}_{int(datetime.utcnow().timestamp() * 1000)}",
                 "video_id": video_id,
@@ -143,35 +254,542 @@ async def screen_video(video_path: str):
                     "risk_score": str(risk_score),
                     "screening_type": "cpu",
                     "frames_analyzed": len(frame_features),
+                    "sampling_mode": sampling_stats["mode"],
+                    "frames_decoded": sampling_stats["frames_decoded"],
+                    "early_exit_reason": sampling_stats.get("early_exit", {}).get("reason"),
+                    "frames_skipped": sampling_stats.get("early_exit", {}).get("frames_skipped"),
+                    "cache_hit": sampling_stats.get("cache") == "hit",
+                    "screening_model": model_result["model_version"] if model_result else "heuristic",
+                    "escalation_score": str(model_result["escalation_score"]) if model_result else None,
+                    "escalation_threshold": str(escalation_threshold),
+                    "threshold_boost": str(escalation_controller.boost) if escalation_controller else "0",
                     "needs_gpu": needs_gpu
                 },
                 "timestamp": datetime.utcnow().isoformat(),
                 "ttl": int(datetime.utcnow().timestamp()) + (90 * 24 * 60 * 60)  # 90 days TTL
             }
-        )
+        ))
     except ClientError as e:
         print(f"Failed to log event (non-critical): {e}")
     
     # Send to GPU queue if high risk
     if needs_gpu and SQS_GPU_QUEUE_URL:
         try:
-            sqs_client.send_message(
+            await loop.run_in_executor(None, functools.partial(
+                sqs_client.send_message,
                 QueueUrl=SQS_GPU_QUEUE_URL,
                 MessageBody=json.dumps({
                     "video_id": video_id,
                     "risk_score": str(risk_score),
+                    "features_key": features_key,
+                    "frame_artifact_key": sampling_stats.get("frame_artifact"),
+                    "segment_hints": sampling_stats.get("segment_hints", []),
                     "priority": "high" if risk_score > 0.7 else "normal"
                 })
-            )
+            ))
+            if escalation_controller:
+                escalation_controller.record_escalation()
         except ClientError as e:
             print(f"Failed to send message to GPU queue: {e}")
     
     return {
         "risk_score": float(risk_score),
         "needs_gpu": needs_gpu,
-        "frames_analyzed": len(frame_features)
+        "screening_model": model_result,
+        "escalation_threshold": escalation_threshold,
+        "frames_analyzed": len(frame_features),
+        "frames_skipped": sampling_stats.get("early_exit", {}).get("frames_skipped", 0),
+        "early_exit": sampling_stats.get("early_exit"),
+        "sampling": sampling_stats
     }
 
+async def trigger_policy_engine_async(video_id, risk_score, max_retries=3):
+    """POST a low-risk decision request through the shared async client, with async exponential backoff"""
+    for attempt in range(max_retries):
+        try:
+            response = await policy_client.post(
+                f"{POLICY_ENGINE_URL}/decide",
+                json={
+                    "video_id": video_id,
+                    "risk_score": float(risk_score),
+                    "nsfw_score": 0.0,
+                    "violence_score": 0.0,
+                    "hate_speech_score": 0.0,
+                },
+            )
+            if response.status_code == 200:
+                print(f"✅ Policy engine triggered for {video_id}: {response.json()}")
+                return True
+            print(f"⚠️  Policy engine returned {response.status_code}: {response.text}")
+        except Exception as e:
+            print(f"⚠️  Failed to trigger policy for low-risk video (attempt {attempt + 1}/{max_retries}): {e}")
+        if attempt < max_retries - 1:
+            await asyncio.sleep(2 ** attempt)  # Exponential backoff: 1s, 2s (without blocking the event loop)
+    print(f"❌ All retries failed for {video_id}. Video will be fixed by background worker.")
+    return False
+
+def sampling_interval_frames(fps, interval_seconds=SAMPLE_INTERVAL_SECONDS):
+    """Number of frames between two samples (falls back to 30 when the container reports no FPS)"""
+    if not fps or fps <= 0:
+        return 30
+    return max(1, int(fps * interval_seconds))
+
+def resize_for_analysis(frame, max_height=ANALYSIS_MAX_HEIGHT):
+    """Downscale a frame to max_height (keeping aspect ratio); smaller frames are returned as-is"""
+    height, width = frame.shape[:2]
+    if max_height <= 0 or height <= max_height:
+        return frame
+    new_width = max(1, int(round(width * max_height / height)))
+    return cv2.resize(frame, (new_width, max_height), interpolation=cv2.INTER_AREA)
+
+def sample_frames(cap, mode=SAMPLING_MODE, interval_seconds=SAMPLE_INTERVAL_SECONDS, stats=None,
+                  max_height=ANALYSIS_MAX_HEIGHT, start_frame=0, end_frame=None, artifact=None):
+    """Yield (frame_index, frame) at the sampling interval, converting only the sampled frames.
+
+    grab() decodes a frame without producing a BGR image; retrieve() does the colour
+    conversion, so only sampled frames pay that cost (frames_decoded vs frames_converted).
+    Only seek mode avoids decoding the frames in between. Frames are downscaled to
+    max_height here, before any feature extraction. start_frame/end_frame restrict
+    sampling to [start_frame, end_frame); start_frame must lie on the sample grid.
+    An artifact (FrameArtifact) also receives frames on its own interval; only exact
+    sampling decodes every frame, so other modes mark the artifact incomplete.
+    """
+    if mode not in SAMPLING_MODES:
+        raise ValueError(f"Unknown sampling mode '{mode}', expected one of {SAMPLING_MODES}")
+    if stats is None:
+        stats = {}
+    stats.update({"mode": mode, "frames_grabbed": 0, "frames_decoded": 0, "frames_converted": 0, "seeks": 0,
+                  "analysis_max_height": max_height})
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    interval = sampling_interval_frames(fps, interval_seconds)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    stats["interval_frames"] = interval
+    stats["fps"] = fps
+    stats["frame_count"] = frame_count
+    if end_frame is None:
+        end_frame = frame_count if frame_count > 0 else float("inf")
+    artifact_interval = 0
+    if artifact is not None:
+        artifact.set_source(fps, frame_count)
+        if mode == "exact" or frame_count <= 0:
+            artifact_interval = sampling_interval_frames(fps, artifact.interval_seconds)
+        else:
+            artifact.complete = False
+
+    if mode == "adaptive":
+        yield from _sample_adaptive(cap, fps, start_frame, end_frame, stats, max_height)
+        return
+
+    if mode == "seek" and frame_count > 0:
+        if not hasattr(cap, "seek_keyframe"):
+            raise ValueError("Seek sampling needs a keyframe-seeking decoder (open_video(..., backend='pyav'))")
+        # Nearest-keyframe seeks: one decoded frame per sample point, up to one GOP before it. A keyframe
+        # is kept only for the first grid point that lands on it, i.e. when the previous grid point lies
+        # before it; that depends on the grid alone, so segments agree with a sequential pass.
+        stats.update({"seek_duplicates": 0, "max_seek_offset_seconds": 0.0})
+        for target in range(start_frame, min(end_frame, frame_count), interval):
+            frame_index = cap.seek_keyframe(target)
+            stats["seeks"] += 1
+            if frame_index is None:
+                break
+            stats["frames_decoded"] += 1
+            if frame_index <= target - interval:
+                stats["seek_duplicates"] += 1
+                continue
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+            stats["frames_converted"] += 1
+            stats["max_seek_offset_seconds"] = max(stats["max_seek_offset_seconds"],
+                                                   round((target - frame_index) / fps, 3))
+            yield frame_index, resize_for_analysis(frame, max_height)
+        return
+
+    # Exact interval (also the fallback for streams without a known frame count)
+    count = start_frame
+    if start_frame > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        stats["seeks"] += 1
+    while count < end_frame and cap.grab():
+        stats["frames_grabbed"] += 1
+        stats["frames_decoded"] += 1
+        sampled = count % interval == 0
+        kept = artifact_interval and count % artifact_interval == 0
+        if sampled or kept:
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+            stats["frames_converted"] += 1
+            if kept:
+                artifact.add(count, frame)
+            if sampled:
+                yield count, resize_for_analysis(frame, max_height)
+        count += 1
+
+# Largest per-frame value of each risk input: edge fraction, mean of the 0/255 skin mask, and the std of
+# an L2-normalized 512-bin histogram (one full bin: sqrt(1/512 - 1/512^2))
+FEATURE_MAX = (1.0, 255.0, float(np.sqrt(1.0 / 512 - 1.0 / 512 ** 2)))
+
+def _std_range(values, remaining, high):
+    """Smallest and largest population std of `values` plus `remaining` unknown values in [0, high].
+
+    The smallest puts every unknown at the seen mean; variance is convex in each unknown, so the
+    largest puts each at 0 or high, and the best count at `high` solves a concave quadratic.
+    """
+    n, total = len(values), len(values) + remaining
+    low = float(np.sqrt(n * np.var(values) / total))
+    s, q = float(np.sum(values)), float(np.sum(values ** 2))
+    best = 0.0
+    k_star = (total * high / 2.0 - s) / high
+    for k in {0, remaining, int(np.clip(np.floor(k_star), 0, remaining)), int(np.clip(np.ceil(k_star), 0, remaining))}:
+        best = max(best, (q + k * high ** 2) / total - ((s + k * high) / total) ** 2)
+    return low, float(np.sqrt(max(best, 0.0)))
+
+def risk_bounds(frame_features, total_samples=0):
+    """Return (risk, low, high): calculate_risk_score of the frames seen so far, and the lowest and highest
+    full-video score whatever the remaining total_samples - len(frame_features) samples turn out to be.
+
+    Worst case rather than a statistical bound, because the frames arrive in playback order and are not
+    a random sample of the video (a calm intro says nothing about what follows). Each term of the score
+    is bounded on its own, so (low, high) is conservative. Unbounded when total_samples is unknown.
+    """
+    risk = calculate_risk_score(frame_features)
+    n = len(frame_features)
+    if not total_samples:
+        return risk, 0.0, 1.0
+    remaining = max(0, total_samples - n)
+    total = n + remaining
+    columns = frame_features[:, :3].astype(np.float64)
+    sums = columns.sum(axis=0)
+    mean_low = sums / total
+    mean_high = (sums + remaining * np.array(FEATURE_MAX)) / total
+    std_low, std_high = _std_range(columns[:, 0], remaining, FEATURE_MAX[0])
+
+    def score(motion, volatility, skin, color):
+        return float(np.clip(0.30 * np.clip(motion, 0, 1) + 0.20 * np.clip(volatility, 0, 1)
+                             + 0.15 * np.clip(skin, 0, 1) + 0.10 * np.clip(color / 0.5, 0, 1), 0.0, 1.0))
+
+    low = score(mean_low[0], 2.0 * std_low, mean_low[1], mean_low[2])
+    high = score(mean_high[0], 2.0 * std_high, mean_high[1], mean_high[2])
+    return risk, low, high
+
+class EarlyExitMonitor:
+    """Collects feature batches (from one or several segments) and decides when to stop sampling.
+
+    The decision has to hold for every threshold escalation_decision may apply when the video
+    is finalized, i.e. from threshold up to max_threshold (the backlog controller's largest boost).
+    """
+
+    def __init__(self, total_samples=0, threshold=None, max_threshold=None, min_frames=EARLY_EXIT_MIN_FRAMES):
+        self.total_samples = total_samples
+        self.threshold = RISK_ESCALATION_THRESHOLD if threshold is None else threshold
+        self.max_threshold = self.threshold if max_threshold is None else max_threshold
+        self.min_frames = min_frames
+        self.lock = threading.Lock()
+        self.matrices = []
+        self.frames_seen = 0
+        self.stopped = False
+        self.result = None
+
+    def add(self, matrix):
+        """Record a batch; returns True once the escalation decision is settled"""
+        with self.lock:
+            if self.stopped:
+                return True
+            self.matrices.append(matrix)
+            self.frames_seen += len(matrix)
+            if self.frames_seen < self.min_frames:
+                return False
+            risk, low, high = risk_bounds(np.concatenate(self.matrices), self.total_samples)
+            if low > self.max_threshold:
+                reason = "risk_above_threshold"
+            elif high <= self.threshold:
+                reason = "risk_below_threshold"
+            else:
+                return False
+            self.stopped = True
+            self.result = {
+                "reason": reason,
+                "risk_estimate": round(risk, 4),
+                "risk_range": [round(low, 4), round(high, 4)],
+                "frames_analyzed": self.frames_seen,
+                "frames_skipped": max(0, self.total_samples - self.frames_seen) if self.total_samples else None
+            }
+            return True
+
+def new_early_exit_monitor(frame_count=0, fps=0):
+    """EarlyExitMonitor sized for the video, or None (also when frame_count is unknown: nothing bounds the rest).
+
+    The bound is on calculate_risk_score, so there is no early exit while a learned screening
+    model is loaded: escalation_decision then uses the model's score instead. The threshold range
+    covers any boost, since the boost can change before (and is only known where) the video is finalized.
+    """
+    if frame_count <= 0 or (screening_model is not None and screening_model.refresh() is not None):
+        return None
+    total_samples = -(-frame_count // sampling_interval_frames(fps))
+    max_boost = escalation_controller.max_boost if escalation_controller else 0.0
+    return EarlyExitMonitor(total_samples=total_samples, threshold=RISK_ESCALATION_THRESHOLD,
+                            max_threshold=RISK_ESCALATION_THRESHOLD + max_boost)
+
+def _sample_adaptive(cap, fps, start_frame, end_frame, stats, max_height):
+    """Adaptive sampling: probe a low-resolution luma thumbnail, sample densely after shot boundaries"""
+    fps = fps if fps and fps > 0 else 30.0
+    probe_interval = max(1, int(round(fps * ADAPTIVE_PROBE_SECONDS)))
+    dense_frames = fps * ADAPTIVE_DENSE_SECONDS
+    sparse_frames = fps * ADAPTIVE_SPARSE_SECONDS
+    # Token bucket: refills at ADAPTIVE_FRAMES_PER_MINUTE, holds at most ADAPTIVE_BURST_FRAMES
+    refill_per_frame = ADAPTIVE_FRAMES_PER_MINUTE / (fps * 60.0)
+    tokens = float(ADAPTIVE_BURST_FRAMES)
+    stats.update({"scene_changes": 0, "probes": 0})
+
+    previous_thumb = None
+    last_change = None
+    last_sample = None
+
+    count = start_frame
+    if start_frame > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        stats["seeks"] += 1
+    while count < end_frame and cap.grab():
+        stats["frames_grabbed"] += 1
+        stats["frames_decoded"] += 1
+        if (count - start_frame) % probe_interval == 0:
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+            stats["frames_converted"] += 1
+            stats["probes"] += 1
+            if count > start_frame:
+                tokens = min(float(ADAPTIVE_BURST_FRAMES), tokens + probe_interval * refill_per_frame)
+            thumb = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (32, 18), interpolation=cv2.INTER_AREA)
+            if previous_thumb is not None and cv2.norm(thumb, previous_thumb, cv2.NORM_L1) / thumb.size > ADAPTIVE_SCENE_THRESHOLD:
+                last_change = count
+                stats["scene_changes"] += 1
+            previous_thumb = thumb
+
+            near_change = last_change is not None and count - last_change < dense_frames
+            stale = last_sample is None or count - last_sample >= sparse_frames
+            if (near_change or stale) and tokens >= 1.0:
+                tokens -= 1.0
+                last_sample = count
+                yield count, resize_for_analysis(frame, max_height)
+        count += 1
+
+class FeatureStore:
+    """Growable per-frame feature columns: one contiguous float32 array per FEATURE_COLUMNS entry.
+
+    Each worker thread keeps one store (see thread_feature_store) and resets it per video,
+    so steady-state screening writes features in place instead of allocating per batch.
+    """
+
+    def __init__(self, capacity=FEATURE_STORE_CAPACITY):
+        self._columns = np.empty((len(FEATURE_COLUMNS), max(1, capacity)), dtype=np.float32)
+        self.size = 0
+
+    def reset(self):
+        self.size = 0
+        return self
+
+    @property
+    def capacity(self):
+        return self._columns.shape[1]
+
+    def reserve(self, rows):
+        """Append `rows` rows and return them as a writable (rows, 4) view, doubling capacity if needed"""
+        needed = self.size + rows
+        if needed > self.capacity:
+            grown = np.empty((len(FEATURE_COLUMNS), max(needed, 2 * self.capacity)), dtype=np.float32)
+            grown[:, :self.size] = self._columns[:, :self.size]
+            self._columns = grown
+        view = self._columns[:, self.size:needed].T
+        self.size = needed
+        return view
+
+    def column(self, name):
+        """Contiguous view of one feature column"""
+        return self._columns[FEATURE_COLUMNS.index(name), :self.size]
+
+    @property
+    def matrix(self):
+        """(N, 4) view of the stored features (valid until the store is reset)"""
+        return self._columns[:, :self.size].T
+
+    def snapshot(self):
+        """(N, 4) copy that outlives the store, still laid out column by column"""
+        return self._columns[:, :self.size].copy().T
+
+_thread_stores = threading.local()
+
+def thread_feature_store():
+    """The calling thread's FeatureStore, reset for a new video"""
+    store = getattr(_thread_stores, "store", None)
+    if store is None:
+        store = _thread_stores.store = FeatureStore()
+    return store.reset()
+
+def serialize_features(frame_features):
+    """Feature matrix -> .npy bytes (float32 with shape header) for Redis/S3"""
+    buffer = io.BytesIO()
+    np.save(buffer, np.asarray(frame_features, dtype=np.float32), allow_pickle=False)
+    return buffer.getvalue()
+
+def deserialize_features(data):
+    """.npy bytes from serialize_features -> (N, 4) float32 feature matrix"""
+    frame_features = np.load(io.BytesIO(data), allow_pickle=False)
+    return frame_features.reshape(-1, len(FEATURE_COLUMNS))
+
+def features_s3_key(video_id):
+    return f"{FEATURES_S3_PREFIX}{video_id}.npy"
+
+def export_features(video_id, frame_features):
+    """Upload a video's feature matrix to S3 so later stages can reuse it; returns the key or None"""
+    key = features_s3_key(video_id)
+    try:
+        s3_client.put_object(Bucket=S3_BUCKET_NAME, Key=key, Body=serialize_features(frame_features),
+                             ContentType="application/octet-stream")
+        return key
+    except Exception as e:
+        print(f"⚠️  Failed to export features for {video_id} (non-critical): {e}")
+        return None
+
+def extract_features_from_frames(frames, batch_size=FEATURE_BATCH_SIZE, monitor=None):
+    """Run extract_batch_features over an iterable of frames, batch_size frames at a time.
+
+    Features are written straight into the thread's FeatureStore. With a monitor, stops
+    pulling frames (and so decoding) as soon as it reports the escalation decision is settled.
+    """
+    store = thread_feature_store()
+    batch = None
+    filled = 0
+
+    def flush(frames_batch):
+        rows = extract_batch_features(frames_batch, out=store.reserve(len(frames_batch)))
+        return monitor is not None and monitor.add(rows)
+
+    for frame in frames:
+        if monitor is not None and monitor.stopped:
+            filled = 0
+            break
+        if batch is None or batch.shape[1:] != frame.shape:
+            if filled and flush(batch[:filled]):
+                filled = 0
+                break
+            batch = np.empty((batch_size,) + frame.shape, dtype=np.uint8)
+            filled = 0
+        batch[filled] = frame
+        filled += 1
+        if filled == batch_size:
+            filled = 0
+            if flush(batch):
+                break
+    if filled:
+        flush(batch[:filled])
+    return store.snapshot()
+
+def collect_segment_features(video_path, start_frame, end_frame, mode=SAMPLING_MODE,
+                             batch_size=FEATURE_BATCH_SIZE, max_height=ANALYSIS_MAX_HEIGHT, monitor=None, artifact=None):
+    """Screen one [start_frame, end_frame) segment with its own decoder handle (PyAV for seek sampling)"""
+    cap = open_video(video_path, backend="pyav" if mode == "seek" else DECODER_BACKEND,
+                     output_max_height=max_height if DECODER_SCALED_OUTPUT else 0)
+    stats = {"decoder": DECODER_BACKEND, "decoder_lowres": getattr(cap, "lowres", 0)}
+    try:
+        frames = sample_frames(cap, mode=mode, stats=stats, max_height=max_height,
+                               start_frame=start_frame, end_frame=end_frame, artifact=artifact)
+        indices = []
+
+        def indexed_frames():
+            for index, frame in frames:
+                indices.append(index)
+                yield frame
+
+        frame_features = extract_features_from_frames(indexed_frames(), batch_size, monitor)
+        # Frames pulled after an early-exit stop were never featurized, and they are always the last ones
+        stats["frame_indices"] = indices[:len(frame_features)]
+        if monitor is not None and monitor.result:
+            stats["early_exit"] = monitor.result
+            if artifact is not None:
+                artifact.complete = False  # decoding stopped before the end of the video
+        return frame_features, stats
+    finally:
+        cap.release()
+
+def plan_segments(frame_count, interval, segments):
+    """Split [0, frame_count) into up to `segments` ranges whose starts lie on the sample grid"""
+    samples = -(-frame_count // interval)  # ceil
+    per_segment = -(-samples // max(1, segments))
+    bounds = [i * per_segment * interval for i in range(segments)] + [frame_count]
+    return [(start, min(bounds[i + 1], frame_count)) for i, start in enumerate(bounds[:-1]) if start < frame_count]
+
+_segment_executor = None
+_segment_executor_lock = threading.Lock()
+
+def segment_executor():
+    """Long-lived segment thread pool, so each thread's FeatureStore is reused across videos"""
+    global _segment_executor
+    with _segment_executor_lock:
+        if _segment_executor is None:
+            _segment_executor = ThreadPoolExecutor(max_workers=max(1, SEGMENT_WORKERS),
+                                                   thread_name_prefix="segment")
+        return _segment_executor
+
+def collect_frame_features(video_path, mode=SAMPLING_MODE, batch_size=FEATURE_BATCH_SIZE,
+                           max_height=ANALYSIS_MAX_HEIGHT, segment_workers=None, early_exit=None,
+                           artifact=None):
+    """Sample a video file and return its (N, 4) float32 feature matrix plus sampling stats.
+
+    Videos longer than SEGMENT_MIN_SECONDS are split into time segments that are decoded
+    and screened in parallel threads (OpenCV releases the GIL); the per-segment matrices
+    are concatenated in order, so the result equals the sequential one. Adaptive sampling
+    is never split: its per-minute frame budget and scene state run through the whole
+    video, and a segment would start with a fresh burst allowance. With early exit
+    (EARLY_EXIT_ENABLED unless overridden) all segments feed one monitor and stop together
+    once the escalation decision is settled; the risk score is order-independent, so the
+    partial matrices still concatenate into a valid sample. An artifact collects frames
+    from every segment.
+    """
+    if segment_workers is None:
+        segment_workers = SEGMENT_WORKERS  # read at call time: init_screening_worker may lower it
+    cap = open_video(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    cap.release()
+
+    segments = []
+    if segment_workers > 1 and mode != "adaptive" and fps > 0 and frame_count / fps >= SEGMENT_MIN_SECONDS:
+        segments = plan_segments(frame_count, sampling_interval_frames(fps), segment_workers)
+    if len(segments) <= 1:
+        segments = [(0, None)]
+
+    if early_exit is None:
+        early_exit = EARLY_EXIT_ENABLED
+    monitor = new_early_exit_monitor(frame_count, fps) if early_exit else None
+
+    def run_segment(bounds):
+        return collect_segment_features(video_path, bounds[0], bounds[1], mode, batch_size, max_height, monitor,
+                                        artifact)
+
+    if len(segments) == 1:
+        results = [run_segment(segments[0])]
+    else:
+        results = list(segment_executor().map(run_segment, segments))
+
+    stats = dict(results[0][1])
+    for key in ("frames_grabbed", "frames_decoded", "frames_converted", "seeks"):
+        stats[key] = sum(segment_stats.get(key, 0) for _, segment_stats in results)
+    if "seek_duplicates" in stats:
+        stats["seek_duplicates"] = sum(segment_stats.get("seek_duplicates", 0) for _, segment_stats in results)
+        stats["max_seek_offset_seconds"] = max(s.get("max_seek_offset_seconds", 0.0) for _, s in results)
+    stats["frame_indices"] = [index for _, segment_stats in results for index in segment_stats["frame_indices"]]
+    frame_features = np.concatenate([matrix for matrix, _ in results])
+    stats["segments"] = len(segments)
+    stats.pop("early_exit", None)
+    if monitor is not None and monitor.result and len(frame_features) < monitor.total_samples:
+        # Other segments may finish their in-flight batch after the stop, so count what was kept
+        stats["early_exit"] = dict(monitor.result, frames_analyzed=len(frame_features),
+                                   frames_skipped=monitor.total_samples - len(frame_features))
+    return frame_features, attach_segment_hints(frame_features, stats)
+
 def extract_frame_features(frame):
     """Extract multiple features for AI risk assessment"""
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
@@ -198,30 +816,285 @@ def extract_frame_features(frame):
         "brightness": brightness
     }
 
-def calculate_risk_score(frame_features):
-    """Calculate risk score using normalized classical ML features with improved violence detection."""
-    motion_scores = [f["motion"] for f in frame_features]
-    skin_ratios = [f["skin_ratio"] for f in frame_features]
-    color_variances = [f["color_variance"] for f in frame_features]
-
-    # Normalize and clamp each feature to 0-1
-    motion = float(np.clip(np.mean(motion_scores), 0.0, 1.0))
-    skin = float(np.clip(np.mean(skin_ratios), 0.0, 1.0))
-    # Empirical scale to keep color variance in a reasonable range
-    color = float(np.clip(np.mean(color_variances) / 0.5, 0.0, 1.0))
-    
-    # Detect rapid motion changes (indicator of action/violence)
-    if len(motion_scores) > 1:
-        motion_variance = float(np.std(motion_scores))
-        # High motion variance suggests action/violence scenes
-        motion_volatility = float(np.clip(motion_variance * 2.0, 0.0, 1.0))
-    else:
-        motion_volatility = 0.0
+def extract_batch_features(frames, out=None):
+    """Vectorized extract_frame_features over a (N, H, W, 3) BGR stack -> (N, 4) float32 matrix.
+
+    Columns follow FEATURE_COLUMNS and match the per-frame dict values, including
+    skin_ratio being the mean of the 0/255 mask (the risk score clips it to 0-1).
+    Writes into `out` (e.g. FeatureStore.reserve rows) when given.
+    """
+    frames = np.ascontiguousarray(frames)
+    n, height, width = frames.shape[:3]
+    pixels = height * width
+
+    # Colour conversions are per-pixel, so the batch runs as one tall image per OpenCV call
+    tall = frames.reshape(n * height, width, 3)
+    gray = cv2.cvtColor(tall, cv2.COLOR_BGR2GRAY).reshape(n, height, width)
+    hsv = cv2.cvtColor(tall, cv2.COLOR_BGR2HSV)
+    skin_mask = cv2.inRange(hsv, (0, 20, 70), (20, 255, 255)).reshape(n, height, width)
+
+    # Neighbourhood ops and reductions run per frame on views of the stacked arrays (no copies);
+    # OpenCV's reductions are much cheaper than np.sum/np.mean over uint8 images
+    edge_pixels = np.empty(n, dtype=np.float64)
+    skin_pixels = np.empty(n, dtype=np.float64)
+    brightness = np.empty(n, dtype=np.float64)
+    hist = np.empty((n, 512), dtype=np.float64)
+    for i in range(n):
+        edge_pixels[i] = cv2.countNonZero(cv2.Canny(gray[i], 100, 200))
+        skin_pixels[i] = cv2.countNonZero(skin_mask[i])
+        brightness[i] = cv2.mean(gray[i])[0]
+        hist[i] = cv2.calcHist([frames[i]], [0, 1, 2], None, [8, 8, 8], [0, 256, 0, 256, 0, 256]).ravel()
+
+    # Histogram normalization (cv2.normalize default is L2) and spread for the whole batch
+    norms = np.linalg.norm(hist, axis=1, keepdims=True)
+    hist /= np.where(norms > 0, norms, 1.0)
+
+    matrix = np.empty((n, len(FEATURE_COLUMNS)), dtype=np.float32) if out is None else out
+    matrix[:, 0] = edge_pixels / pixels
+    matrix[:, 1] = skin_pixels * 255.0 / pixels
+    matrix[:, 2] = hist.std(axis=1)
+    matrix[:, 3] = brightness
+    return matrix
+
+def frame_risk_scores(frame_features):
+    """Per-frame counterpart of calculate_risk_score: same weights, volatility from neighbouring frames"""
+    features = np.asarray(frame_features, dtype=np.float64)
+    motion = np.clip(features[:, 0], 0.0, 1.0)
+    skin = np.clip(features[:, 1], 0.0, 1.0)
+    color = np.clip(features[:, 2] / 0.5, 0.0, 1.0)
+    volatility = np.zeros(len(features))
+    if len(features) > 1:
+        jumps = np.abs(np.diff(features[:, 0]))
+        volatility = np.clip(2.0 * np.maximum(np.append(jumps, 0.0), np.insert(jumps, 0, 0.0)), 0.0, 1.0)
+    return (motion * 0.30) + (volatility * 0.20) + (skin * 0.15) + (color * 0.10)
+
+def suspicious_segments(frame_features, frame_indices, fps, max_segments=SEGMENT_HINTS_MAX, z=SEGMENT_HINT_Z,
+                        padding_seconds=SEGMENT_HINT_PADDING_SECONDS, duration=0.0):
+    """Rank time ranges where per-frame risk spiked above the video's own baseline.
+
+    A frame spikes when its frame_risk_scores value exceeds median + z * MAD-sigma.
+    Consecutive spiking samples are merged into one range, padded by padding_seconds,
+    and ranges are ranked by their peak score. Returns [{"start", "end", "score"}] in seconds.
+    """
+    if len(frame_features) < 3 or fps <= 0 or len(frame_indices) != len(frame_features):
+        return []
+    scores = frame_risk_scores(frame_features)
+    median = float(np.median(scores))
+    sigma = max(1.4826 * float(np.median(np.abs(scores - median))), 0.01)
+    spikes = np.flatnonzero(scores > median + z * sigma)
+    if len(spikes) == 0:
+        return []
+
+    times = np.asarray(frame_indices, dtype=np.float64) / fps
+    max_gap = 2.0 * float(np.median(np.diff(times))) if len(times) > 1 else 0.0
+    runs = [[spikes[0]]]
+    for row in spikes[1:]:
+        if times[row] - times[runs[-1][-1]] <= max_gap:
+            runs[-1].append(row)
+        else:
+            runs.append([row])
+
+    end_limit = duration if duration > 0 else float(times[-1]) + padding_seconds
+    segments = []
+    for run in runs:
+        start = max(0.0, float(times[run[0]]) - padding_seconds)
+        end = min(end_limit, float(times[run[-1]]) + padding_seconds)
+        segments.append({"start": round(start, 2), "end": round(end, 2), "score": round(float(scores[run].max()), 4)})
+    segments.sort(key=lambda segment: segment["score"], reverse=True)
+    return segments[:max_segments]
+
+def attach_segment_hints(frame_features, sampling_stats):
+    """Replace the per-row frame indices in the stats with ranked suspicious-segment hints"""
+    frame_indices = sampling_stats.pop("frame_indices", [])
+    fps = sampling_stats.get("fps", 0)
+    duration = sampling_stats.get("frame_count", 0) / fps if fps else 0.0
+    sampling_stats["segment_hints"] = suspicious_segments(frame_features, frame_indices, fps, duration=duration)
+    return sampling_stats
+
+class ScreeningModel:
+    """Logistic-regression escalation model, hot-reloaded from S3 when the pointer object's ETag changes.
+
+    The pointer is {"version": "vN", "key": "models/screening/vN.json"}; the model JSON holds the feature
+    names, standardization (mean/scale), coef, intercept and the escalation threshold picked at training time.
+    """
+
+    def __init__(self, pointer_key=SCREENING_MODEL_POINTER_KEY, poll_seconds=SCREENING_MODEL_POLL_SECONDS):
+        self.pointer_key = pointer_key
+        self.poll_seconds = poll_seconds
+        self.etag = None
+        self.model = None
+        self.checked_at = None
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def parse(spec):
+        """Validate a model JSON document; returns it with numpy arrays for evaluation"""
+        if spec.get("type") != "logistic_regression":
+            raise ValueError(f"unsupported model type {spec.get('type')!r}")
+        unknown = set(spec["features"]) - set(SCREENING_MODEL_FEATURES)
+        if unknown:
+            raise ValueError(f"unknown features {sorted(unknown)}")
+        model = dict(spec)
+        for name in ("mean", "scale", "coef"):
+            model[name] = np.asarray(spec[name], dtype=np.float64)
+            if model[name].shape != (len(spec["features"]),):
+                raise ValueError(f"{name} has shape {model[name].shape}, expected ({len(spec['features'])},)")
+        model["intercept"] = float(spec["intercept"])
+        model["threshold"] = float(spec["threshold"])
+        return model
+
+    def refresh(self):
+        """Re-check the pointer at most every poll_seconds; a missing pointer falls back to the heuristic"""
+        now = time.monotonic()
+        if self.checked_at is not None and now - self.checked_at < self.poll_seconds:
+            return self.model
+        with self.lock:
+            if self.checked_at is not None and now - self.checked_at < self.poll_seconds:
+                return self.model
+            self.checked_at = now
+            try:
+                request = {"Bucket": S3_BUCKET_NAME, "Key": self.pointer_key}
+                if self.etag:
+                    request["IfNoneMatch"] = self.etag
+                response = s3_client.get_object(**request)
+                model_key = json.loads(response["Body"].read())["key"]
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if code in ("404", "NoSuchKey"):
+                    if self.model is not None:
+                        print("⚠️  Screening model pointer removed, falling back to heuristic risk score")
+                    self.model, self.etag = None, None
+                elif code not in ("304", "NotModified"):
+                    print(f"⚠️  Failed to check screening model (keeping current): {e}")
+                return self.model
+            except Exception as e:
+                print(f"⚠️  Invalid screening model pointer at {self.pointer_key} (keeping current): {e}")
+                return self.model
+            try:
+                # etag only advances once the version loads, so a missing/bad version is retried next poll
+                body = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=model_key)["Body"].read()
+                self.model = self.parse(json.loads(body))
+                self.etag = response["ETag"]
+                print(f"🧠 Loaded screening model {self.model['version']} "
+                      f"(threshold={self.model['threshold']:.3f}, {len(self.model['features'])} features)")
+            except Exception as e:
+                print(f"⚠️  Failed to load screening model {model_key} (keeping current): {e}")
+        return self.model
+
+    def score(self, frame_features, has_violent_keyword=False):
+        """{"escalation_score", "threshold", "model_version"} for a video, or None when no model is loaded"""
+        model = self.refresh()
+        if model is None:
+            return None
+        vector = screening_feature_vector(frame_features, has_violent_keyword)
+        x = (np.array([vector[name] for name in model["features"]]) - model["mean"]) / model["scale"]
+        logit = float(np.dot(model["coef"], x) + model["intercept"])
+        return {
+            "escalation_score": float(1.0 / (1.0 + np.exp(-np.clip(logit, -50.0, 50.0)))),
+            "threshold": model["threshold"],
+            "model_version": model["version"],
+        }
+
+screening_model = ScreeningModel() if SCREENING_MODEL_ENABLED and S3_BUCKET_NAME else None
+
+class EscalationController:
+    """Raises the escalation threshold while the deep-vision backlog would take too long to drain.
+
+    Every interval it reads the GPU queue depth (visible + in flight), estimates deep-vision's drain rate
+    from how the depth moved against the escalations this replica sent, and compares the projected queueing
+    delay (depth / drain rate) with the target. Above the target the threshold boost grows by one step;
+    below half the target it shrinks by one step. The boost stays within [0, max_boost].
+    """
+
+    def __init__(self, target_delay=ESCALATION_TARGET_DELAY_SECONDS, max_boost=ESCALATION_MAX_BOOST,
+                 step=ESCALATION_BOOST_STEP, drain_rate_prior=ESCALATION_DRAIN_RATE_PRIOR, smoothing=0.3):
+        self.target_delay = target_delay
+        self.max_boost = max_boost
+        self.step = step
+        self.smoothing = smoothing
+        self.drain_rate = drain_rate_prior
+        self.boost = 0.0
+        self.sent = 0  # escalations since the last observation
+        self.last = None  # (depth, time) of the last observation
+        self.state = {}
+        self.lock = threading.Lock()
+
+    def record_escalation(self):
+        with self.lock:
+            self.sent += 1
+
+    def observe(self, depth, now):
+        """Update the drain estimate and boost from a queue depth reading; returns the decision record"""
+        with self.lock:
+            sent, self.sent = self.sent, 0
+        if self.last is not None and now > self.last[1]:
+            last_depth, last_time = self.last
+            # An empty queue says nothing about capacity, only a busy one does
+            if last_depth > 0:
+                drained = max(0.0, (last_depth + sent - depth) / (now - last_time))
+                self.drain_rate += self.smoothing * (drained - self.drain_rate)
+        self.last = (depth, now)
+
+        delay = depth / max(self.drain_rate, 1e-3)
+        previous = self.boost
+        if delay > self.target_delay:
+            self.boost = min(self.max_boost, self.boost + self.step)
+        elif delay < self.target_delay / 2:
+            self.boost = max(0.0, self.boost - self.step)
+        self.state = {
+            "queue_depth": depth,
+            "drain_rate": round(self.drain_rate, 4),
+            "estimated_delay_seconds": round(delay, 1),
+            "target_delay_seconds": self.target_delay,
+            "threshold_boost": round(self.boost, 4),
+            "escalations_sent": sent,
+            "changed": self.boost != previous,
+            "observed_at": now,
+        }
+        return self.state
+
+    def poll(self):
+        """Read the GPU queue depth and log the decision"""
+        attributes = sqs_client.get_queue_attributes(
+            QueueUrl=SQS_GPU_QUEUE_URL,
+            AttributeNames=["ApproximateNumberOfMessages", "ApproximateNumberOfMessagesNotVisible"]
+        )["Attributes"]
+        depth = int(attributes.get("ApproximateNumberOfMessages", 0)) + \
+            int(attributes.get("ApproximateNumberOfMessagesNotVisible", 0))
+        state = self.observe(depth, time.time())
+        print(f"{'🎚️ ' if state['changed'] else '📈'} Escalation control: depth={depth} "
+              f"drain={state['drain_rate']:.3f}/s delay≈{state['estimated_delay_seconds']:.0f}s "
+              f"(target {self.target_delay:.0f}s) boost={self.boost:.3f}")
+        return state
+
+    def run(self, interval=ESCALATION_CONTROL_INTERVAL_SECONDS):
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"⚠️  Escalation control poll failed (keeping boost {self.boost:.3f}): {e}")
+            time.sleep(interval)
+
+escalation_controller = EscalationController() if ESCALATION_CONTROL_ENABLED and SQS_GPU_QUEUE_URL else None
+
+def escalation_decision(frame_features, has_violent_keyword):
+    """(needs_gpu, model_result, threshold): learned model when one is loaded, else the hand-tuned threshold
+    + keywords; either threshold is raised by the backlog controller's current boost"""
+    boost = escalation_controller.boost if escalation_controller else 0.0
+    result = screening_model.score(frame_features, has_violent_keyword) if screening_model else None
+    if result is not None:
+        threshold = min(result["threshold"] + boost, 0.999)
+        return result["escalation_score"] >= threshold, result, threshold
+    threshold = RISK_ESCALATION_THRESHOLD + boost
+    return calculate_risk_score(frame_features) > threshold or has_violent_keyword, None, threshold
 
-    # Improved weighted risk calculation with higher weight on motion (violence indicator)
-    # Increased motion weight from 0.15 to 0.30, added motion volatility
-    risk = (motion * 0.30) + (motion_volatility * 0.20) + (skin * 0.15) + (color * 0.10)
-    return float(np.clip(risk, 0.0, 1.0))
+@app.get("/escalation")
+async def escalation_status():
+    """Latest backlog-controller decision (queue depth, drain rate, projected delay, threshold boost)"""
+    if not escalation_controller:
+        return {"enabled": False, "threshold_boost": 0.0}
+    return {"enabled": True, "base_threshold": RISK_ESCALATION_THRESHOLD, **escalation_controller.state,
+            "threshold_boost": escalation_controller.boost}
 
 @app.get("/health")
 async def health():
@@ -230,10 +1103,700 @@ async def health():
         "screening_type": "cpu_classical_ml"
     }
 
+def fetch_video_filename(video_id):
+    """Fetch the original upload filename from DynamoDB (used for keyword checks)"""
+    try:
+        video_response = videos_table.get_item(Key={"video_id": video_id})
+        return video_response.get('Item', {}).get('filename', '')
+    except Exception as e:
+        print(f"⚠️  Failed to fetch video metadata: {e}")
+        return ''
+
+def worker_segment_threads(workers):
+    """Segment threads per pool process, so workers x threads stays within the container's CPUs"""
+    return max(1, min(SEGMENT_WORKERS, available_cpus() // max(1, workers)))
+
+def init_screening_worker(segment_workers=None):
+    """Per-process setup for screening worker processes"""
+    global SEGMENT_WORKERS
+    # Parallelism comes from the pool, so keep OpenCV from oversubscribing cores
+    cv2.setNumThreads(1)
+    if segment_workers is not None:
+        SEGMENT_WORKERS = segment_workers
+
+def mp4_moov_before_mdat(head):
+    """True if the MP4 index (moov) precedes the media data, False if it follows, None if unknown"""
+    offset = 0
+    while offset + 8 <= len(head):
+        size, box_type = struct.unpack(">I4s", head[offset:offset + 8])
+        if size == 1:
+            if offset + 16 > len(head):
+                return None
+            size = struct.unpack(">Q", head[offset + 8:offset + 16])[0]
+        if box_type == b"moov":
+            return True
+        if box_type == b"mdat":
+            return False
+        if size < 8:
+            return None  # size 0 (box runs to EOF) or a corrupt header
+        offset += size
+    return None
+
+class S3VideoStream:
+    """Feeds an S3 object into a named pipe with ranged GETs so decoding overlaps the download.
+
+    With tee_path, every byte is also written to that file; tee_complete tells whether it got the whole object.
+    """
+
+    def __init__(self, bucket, key, head, total_size, chunk_bytes=S3_STREAM_CHUNK_BYTES, prefetch=S3_STREAM_PREFETCH,
+                 tee_path=None):
+        self.bucket = bucket
+        self.key = key
+        self.head = head
+        self.total_size = total_size
+        self.chunk_bytes = chunk_bytes
+        self.prefetch = max(1, prefetch)
+        self.tee_path = tee_path
+        self.error = None
+        self.bytes_written = 0
+        self.tee_bytes = 0
+        self.stopped = threading.Event()
+        self.tmp_dir = tempfile.mkdtemp(prefix="s3-stream-")
+        self.path = os.path.join(self.tmp_dir, "video.mp4")
+        os.mkfifo(self.path)
+        self.thread = threading.Thread(target=self._pump, daemon=True)
+        self.thread.start()
+
+    def _fetch(self, start, end):
+        response = s3_client.get_object(Bucket=self.bucket, Key=self.key, Range=f"bytes={start}-{end}")
+        return response["Body"].read()
+
+    def _pump(self):
+        ranges = [(start, min(start + self.chunk_bytes, self.total_size) - 1)
+                  for start in range(len(self.head), self.total_size, self.chunk_bytes)]
+        try:
+            with contextlib.ExitStack() as stack:
+                fetcher = stack.enter_context(ThreadPoolExecutor(max_workers=self.prefetch))
+                tee = stack.enter_context(open(self.tee_path, "wb")) if self.tee_path else None
+                pipe = stack.enter_context(open(self.path, "wb", buffering=0))
+                self._write(pipe, tee, self.head)
+                pending = [fetcher.submit(self._fetch, *r) for r in ranges[:self.prefetch]]
+                next_range = self.prefetch
+                while pending and not self.stopped.is_set():
+                    chunk = pending.pop(0).result()
+                    if next_range < len(ranges):
+                        pending.append(fetcher.submit(self._fetch, *ranges[next_range]))
+                        next_range += 1
+                    self._write(pipe, tee, chunk)
+                for future in pending:
+                    future.cancel()
+        except BrokenPipeError:
+            pass  # the decoder closed the pipe; completeness is checked by the caller
+        except Exception as e:
+            self.error = e
+
+    def _write(self, pipe, tee, chunk):
+        if tee is not None:
+            tee.write(chunk)
+            self.tee_bytes += len(chunk)
+        pipe.write(chunk)
+        self.bytes_written += len(chunk)
+
+    @property
+    def tee_complete(self):
+        return self.tee_path is not None and self.error is None and self.tee_bytes == self.total_size
+
+    def close(self):
+        self.stopped.set()
+        deadline = time.time() + 30
+        while self.thread.is_alive() and time.time() < deadline:
+            # Unblock a writer still waiting for the decoder to open the pipe
+            try:
+                os.close(os.open(self.path, os.O_RDONLY | os.O_NONBLOCK))
+            except OSError:
+                pass
+            self.thread.join(timeout=0.1)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+class FrameArtifact:
+    """Downscaled JPEG frames sampled every interval_seconds, bundled into one indexed .npz.
+
+    The bundle holds the concatenated JPEG bytes plus per-frame offsets, frame indices and
+    timestamps, and a JSON metadata record (interval, fps, completeness). Segment threads
+    add frames concurrently, so adds are locked and frames are ordered at serialization.
+    """
+
+    VERSION = 1
+
+    def __init__(self, interval_seconds=FRAME_ARTIFACT_INTERVAL_SECONDS, max_height=FRAME_ARTIFACT_MAX_HEIGHT,
+                 quality=FRAME_ARTIFACT_JPEG_QUALITY):
+        self.interval_seconds = interval_seconds
+        self.max_height = max_height
+        self.quality = quality
+        self.fps = 0.0
+        self.frame_count = 0
+        self.complete = True
+        self.frames = {}  # frame index -> JPEG bytes
+        self.lock = threading.Lock()
+
+    def set_source(self, fps, frame_count):
+        self.fps = fps
+        self.frame_count = frame_count
+
+    def add(self, frame_index, frame):
+        ok, jpeg = cv2.imencode(".jpg", resize_for_analysis(frame, self.max_height),
+                                [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if ok:
+            with self.lock:
+                self.frames[frame_index] = jpeg.tobytes()
+
+    def to_bytes(self):
+        indices = sorted(self.frames)
+        blobs = [self.frames[i] for i in indices]
+        metadata = {
+            "version": self.VERSION,
+            "interval_seconds": self.interval_seconds,
+            "fps": self.fps,
+            "frame_count": self.frame_count,
+            "complete": self.complete,
+            "max_height": self.max_height
+        }
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            jpeg=np.frombuffer(b"".join(blobs), dtype=np.uint8),
+            offsets=np.cumsum([0] + [len(b) for b in blobs], dtype=np.int64),
+            frame_indices=np.array(indices, dtype=np.int64),
+            timestamps=np.array(indices, dtype=np.float64) / (self.fps or 1.0),
+            metadata=np.array(json.dumps(metadata))
+        )
+        return buffer.getvalue()
+
+def frame_artifact_key(video_id):
+    return f"{FRAME_ARTIFACT_PREFIX}{video_id}.npz"
+
+def stage_frame_artifact(artifact, frame_features, sampling_stats):
+    """Write a complete artifact to a local temp file (recorded in the stats) for publish_frame_artifact.
+
+    The worker process cannot tell whether the video will be escalated (that needs the filename and the
+    controller's current boost), so the upload waits for the escalation decision.
+    """
+    if not artifact.complete or not artifact.frames or len(frame_features) == 0:
+        return
+    fd, path = tempfile.mkstemp(prefix="frame-artifact-", suffix=".npz")
+    with os.fdopen(fd, "wb") as f:
+        f.write(artifact.to_bytes())
+    sampling_stats["frame_artifact_path"] = path
+
+def publish_frame_artifact(sampling_stats, key, needs_gpu):
+    """Upload a staged artifact to key if the video is escalated (recording the key in the stats); the
+    staged file is removed either way"""
+    path = sampling_stats.pop("frame_artifact_path", None)
+    if path is None:
+        return
+    try:
+        if needs_gpu:
+            s3_client.upload_file(path, S3_BUCKET_NAME, key, ExtraArgs={"ContentType": "application/octet-stream"})
+            sampling_stats["frame_artifact"] = key
+            print(f"🎞️  Frame artifact {key}: {os.path.getsize(path) / 1e6:.1f} MB")
+    except Exception as e:
+        print(f"⚠️  Failed to upload frame artifact {key} (non-critical): {e}")
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+
+def screen_s3_video_streaming(s3_key, artifact=None):
+    """Screen an S3 video while it downloads; returns None when the temp-file path must be used"""
+    probe = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=s3_key, Range=f"bytes=0-{S3_STREAM_PROBE_BYTES - 1}")
+    head = probe["Body"].read()
+    total_size = int(probe["ContentRange"].rsplit("/", 1)[1])
+    if not mp4_moov_before_mdat(head):
+        print(f"ℹ️  {s3_key} has its index at the end of the file, using temp-file download")
+        return None
+
+    # With the node-local cache, a cached copy is screened from disk instead; on a miss the stream also
+    # writes the object into the cache (kept only if the whole object came through) for deep-vision
+    etag = probe["ETag"].strip('"')
+    tee_path, cache_state = None, "miss"
+    if video_cache is not None:
+        cached = video_cache.open_cached(S3_BUCKET_NAME, s3_key, etag)
+        if cached is not None:
+            cached.close()
+            return None
+        if total_size <= video_cache.max_bytes:
+            tee_path = video_cache.begin_part(S3_BUCKET_NAME, s3_key, etag, total_size)
+
+    stream = S3VideoStream(S3_BUCKET_NAME, s3_key, head, total_size, tee_path=tee_path)
+    monitor = new_early_exit_monitor() if EARLY_EXIT_ENABLED else None
+    try:
+        # A pipe cannot seek: one decoder, exact-interval sampling, no segments
+        frame_features, sampling_stats = collect_segment_features(stream.path, 0, None, mode="exact",
+                                                                  monitor=monitor, artifact=artifact)
+    finally:
+        stream.close()
+        if tee_path:
+            try:
+                if stream.tee_complete:
+                    video_cache.commit_part(S3_BUCKET_NAME, s3_key, etag, tee_path)
+                    cache_state = "stored"
+                else:
+                    os.unlink(tee_path)  # stopped early: deep-vision downloads it if it is escalated
+            except OSError as e:
+                print(f"⚠️  Could not cache streamed {s3_key} (non-critical): {e}")
+
+    expected = sampling_stats.get("frame_count", 0)
+    stopped_early = "early_exit" in sampling_stats
+    if stream.error or (expected and not stopped_early and sampling_stats["frames_grabbed"] < expected - 1):
+        print(f"⚠️  Streaming {s3_key} incomplete ({stream.error or 'decoder stopped early'}), "
+              f"using temp-file download")
+        return None
+    sampling_stats["input"] = "stream"
+    if tee_path:
+        sampling_stats["video_cache"] = cache_state
+    return frame_features, attach_segment_hints(frame_features, sampling_stats)
+
+def screening_cache_key(content_id):
+    """Redis key for a video's screening result: the content id plus a hash of every setting that shapes the
+    feature matrix (sampling, decoder, adaptive parameters and, with early exit, where sampling may stop)"""
+    settings = [SAMPLE_INTERVAL_SECONDS, ANALYSIS_MAX_HEIGHT, SAMPLING_MODE,
+                DECODER_BACKEND, DECODER_SCALED_OUTPUT, DECODER_LOWRES]
+    if SAMPLING_MODE == "adaptive":
+        settings += [ADAPTIVE_PROBE_SECONDS, ADAPTIVE_SCENE_THRESHOLD, ADAPTIVE_DENSE_SECONDS, ADAPTIVE_SPARSE_SECONDS,
+                     ADAPTIVE_FRAMES_PER_MINUTE, ADAPTIVE_BURST_FRAMES]
+    if EARLY_EXIT_ENABLED:
+        # Partial matrices depend on the bound and threshold range; with a model loaded there is no early exit
+        model_loaded = screening_model is not None and screening_model.refresh() is not None
+        settings += ["early_exit", EARLY_EXIT_MIN_FRAMES, RISK_ESCALATION_THRESHOLD,
+                     escalation_controller.max_boost if escalation_controller else 0.0, model_loaded]
+    digest = hashlib.sha256(json.dumps(settings).encode()).hexdigest()[:16]
+    return f"screening:v3:{content_id}:{digest}"
+
+def file_content_id(path):
+    """SHA-256 of a local video file (much cheaper than decoding it)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return f"sha256-{digest.hexdigest()}"
+
+def s3_content_id(s3_key):
+    """ETag + size of an S3 object (same bytes uploaded the same way give the same ETag)"""
+    head = s3_client.head_object(Bucket=S3_BUCKET_NAME, Key=s3_key)
+    etag = head['ETag'].strip('"')
+    return f"etag-{etag}-{head['ContentLength']}"
+
+def get_cached_screening(content_id):
+    """Return (frame_features, sampling_stats) from the cache, or None on a miss or Redis error"""
+    try:
+        cached = cache.get(screening_cache_key(content_id))
+    except Exception as e:
+        print(f"⚠️  Screening cache read failed (non-critical): {e}")
+        return None
+    if not cached:
+        return None
+    entry = json.loads(cached)
+    frame_features = deserialize_features(base64.b64decode(entry["features"]))
+    sampling_stats = dict(entry["sampling"], cache="hit")
+    return frame_features, sampling_stats
+
+def put_cached_screening(content_id, frame_features, sampling_stats):
+    """Store a feature matrix with SCREENING_CACHE_TTL_SECONDS.
+
+    Only the features are cached: the escalation decision is recomputed on every hit with the
+    current screening model and threshold boost.
+    """
+    if len(frame_features) == 0:
+        return
+    entry = {
+        "features": base64.b64encode(serialize_features(frame_features)).decode(),
+        "sampling": sampling_stats,
+        "cached_at": datetime.utcnow().isoformat()
+    }
+    try:
+        cache.set(screening_cache_key(content_id), json.dumps(entry), ex=SCREENING_CACHE_TTL_SECONDS)
+    except Exception as e:
+        print(f"⚠️  Screening cache write failed (non-critical): {e}")
+
+def screen_s3_video(s3_key):
+    """Screen an S3 video: cached result if the same bytes were screened before, else stream/download.
+
+    With FRAME_ARTIFACT_ENABLED, a decoded video's frame artifact is staged in a local temp file
+    (sampling_stats["frame_artifact_path"]) for finalize_screening to publish.
+    """
+    content_id = None
+    if SCREENING_CACHE_ENABLED:
+        try:
+            content_id = s3_content_id(s3_key)
+            cached = get_cached_screening(content_id)
+            if cached is not None:
+                print(f"♻️  Cache hit for {s3_key} ({content_id})")
+                return cached
+        except ClientError as e:
+            print(f"⚠️  Failed to read S3 metadata for {s3_key}: {e}")
+
+    artifact = FrameArtifact() if FRAME_ARTIFACT_ENABLED else None
+    frame_features, sampling_stats = download_and_screen_s3_video(s3_key, artifact)
+    if content_id:
+        put_cached_screening(content_id, frame_features, sampling_stats)
+    sampling_stats["cache"] = "miss"
+    if artifact is not None:
+        stage_frame_artifact(artifact, frame_features, sampling_stats)
+    return frame_features, sampling_stats
+
+def screen_local_video(video_path):
+    """Screen a local video file, reusing a cached result keyed by the file's hash"""
+    content_id = None
+    if SCREENING_CACHE_ENABLED:
+        content_id = file_content_id(video_path)
+        cached = get_cached_screening(content_id)
+        if cached is not None:
+            return cached
+
+    artifact = FrameArtifact() if FRAME_ARTIFACT_ENABLED else None
+    frame_features, sampling_stats = collect_frame_features(video_path, artifact=artifact)
+    if content_id:
+        put_cached_screening(content_id, frame_features, sampling_stats)
+    sampling_stats["cache"] = "miss"
+    if artifact is not None:
+        stage_frame_artifact(artifact, frame_features, sampling_stats)
+    return frame_features, sampling_stats
+
+def download_and_screen_s3_video(s3_key, artifact=None):
+    """Download a video from S3 and extract its features (runs in a screening worker process)"""
+    # Streaming returns None for cached videos, index-at-end MP4s and incomplete streams
+    if S3_STREAMING_ENABLED:
+        result = screen_s3_video_streaming(s3_key, artifact)
+        if result is not None:
+            return result
+
+    input_stats = {}
+    with local_video(S3_BUCKET_NAME, s3_key, input_stats) as path:
+        frame_features, sampling_stats = collect_frame_features(path, artifact=artifact)
+    sampling_stats["input"] = "file"
+    sampling_stats.update(input_stats)
+    return frame_features, sampling_stats
+
+def finalize_screening(video_id, s3_key, filename, frame_features, sampling_stats, forward_to_gpu=None):
+    """Score a screened video and record the outcome (DynamoDB, events, GPU queue / policy engine).
+
+    forward_to_gpu(message_body) replaces the direct send_message, e.g. to batch it; returns whether the
+    video was forwarded to the GPU queue.
+    """
+    if len(frame_features) > 0:
+        # Calculate risk score
+        risk_score = calculate_risk_score(frame_features)
+
+        # Use filename from DynamoDB (fetched by the caller)
+        filename_lower = filename.lower() if filename else ""
+
+        # Check for violent keywords in filename
+        has_violent_keyword = any(keyword in filename_lower for keyword in VIOLENT_KEYWORDS)
+
+        # Learned model when loaded; otherwise force GPU analysis if filename suggests violence OR risk score > 0.15
+        needs_gpu, model_result, escalation_threshold = escalation_decision(frame_features, has_violent_keyword)
+        publish_frame_artifact(sampling_stats, frame_artifact_key(video_id), needs_gpu and bool(SQS_GPU_QUEUE_URL))
+
+        if has_violent_keyword and model_result is None:
+            print(f"⚠️  Video {video_id} contains violent keywords in filename, forcing GPU analysis")
+            # Boost risk score for violent keywords to ensure proper handling
+            risk_score = max(risk_score, 0.25)
+
+        # Publish the compact feature matrix so downstream stages don't recompute it
+        features_key = export_features(video_id, frame_features) if FEATURE_EXPORT_ENABLED else None
+
+        # Update video record in DynamoDB
+        videos_table.update_item(
+            Key={"video_id": video_id},
+            UpdateExpression="SET #status = :status, risk_score = :risk_score, screening_type = :screening_type, frames_analyzed = :frames_analyzed, screened_at = :screened_at, screening_model = :screening_model",
+            ExpressionAttributeNames={"#status": "status"},
+            ExpressionAttributeValues={
+                ":status": "gpu_queued" if needs_gpu else "screened",
+                ":risk_score": Decimal(str(risk_score)),
+                ":screening_type": "cpu",
+                ":frames_analyzed": len(frame_features),
+                ":screened_at": datetime.utcnow().isoformat(),
+                ":screening_model": model_result["model_version"] if model_result else "heuristic"
+            }
+        )
+
+        # Log screening event
+        events_table.put_item(
+            Item={
+                "event_id": f"{video_id}_{int(datetime.utcnow().timestamp() * 1000)}",
+                "video_id": video_id,
+                "event_type": "screen",
+                "event_data": {
+                    "risk_score": str(risk_score),
+                    "screening_type": "cpu",
+                    "frames_analyzed": len(frame_features),
+                    "sampling_mode": sampling_stats["mode"],
+                    "frames_decoded": sampling_stats["frames_decoded"],
+                    "early_exit_reason": sampling_stats.get("early_exit", {}).get("reason"),
+                    "frames_skipped": sampling_stats.get("early_exit", {}).get("frames_skipped"),
+                    "cache_hit": sampling_stats.get("cache") == "hit",
+                    "screening_model": model_result["model_version"] if model_result else "heuristic",
+                    "escalation_score": str(model_result["escalation_score"]) if model_result else None,
+                    "escalation_threshold": str(escalation_threshold),
+                    "threshold_boost": str(escalation_controller.boost) if escalation_controller else "0",
+                    "needs_gpu": needs_gpu
+                },
+                "timestamp": datetime.utcnow().isoformat(),
+                "ttl": int(datetime.utcnow().timestamp()) + (90 * 24 * 60 * 60)
+            }
+        )
+
+        # Send to GPU queue if high risk
+        if needs_gpu and SQS_GPU_QUEUE_URL:
+            message_body = json.dumps({
+                "video_id": video_id,
+                "s3_key": s3_key,
+                "risk_score": str(risk_score),
+                "features_key": features_key,
+                "frame_artifact_key": sampling_stats.get("frame_artifact"),
+                "segment_hints": sampling_stats.get("segment_hints", []),
+                "priority": "high" if risk_score > 0.7 else "normal"
+            })
+            if forward_to_gpu:
+                forward_to_gpu(message_body)
+            else:
+                sqs_client.send_message(QueueUrl=SQS_GPU_QUEUE_URL, MessageBody=message_body)
+            if escalation_controller:
+                escalation_controller.record_escalation()
+        else:
+            # Trigger policy engine for low-risk videos so they get immediate AUTO APPROVE
+            try:
+                response = policy_session.post(
+                    f"{POLICY_ENGINE_URL}/decide",
+                    json={
+                        "video_id": video_id,
+                        "risk_score": float(risk_score),
+                        "nsfw_score": 0.0,
+                        "violence_score": 0.0,
+                        "hate_speech_score": 0.0,
+                    },
+                    timeout=10.0,
+                )
+                if response.status_code == 200:
+                    print(f"✅ Policy engine triggered for {video_id}: {response.json()}")
+                else:
+                    print(f"⚠️  Policy engine returned {response.status_code}: {response.text}")
+            except Exception as e:
+                print(f"❌ Failed to trigger policy for low-risk video: {e}")
+                import traceback
+                traceback.print_exc()
+
+        print(f"✅ Screened video {video_id}: risk_score={risk_score:.3f}, needs_gpu={needs_gpu}")
+        return bool(needs_gpu and SQS_GPU_QUEUE_URL)
+    return False
+
+class SQSBatcher:
+    """Buffers SQS sends or deletes for one queue and flushes them 10 per request.
+
+    A batch is flushed as soon as it is full, or by flush_due() once its oldest entry has waited max_wait.
+    Entries that fail retryably (not SenderFault) are re-queued under the same Id, up to max_attempts, so a
+    partial failure never re-sends the entries that succeeded. on_success(entry_id) runs once per entry.
+    """
+
+    def __init__(self, queue_url, action, max_wait=SQS_BATCH_MAX_WAIT_SECONDS, max_attempts=SQS_BATCH_MAX_ATTEMPTS):
+        if action not in ("send", "delete"):
+            raise ValueError(f"Unknown SQS batch action: {action}")
+        self.queue_url = queue_url
+        self.action = action
+        self.max_wait = max_wait
+        self.max_attempts = max_attempts
+        self.pending = {}  # entry id -> {"entry", "on_success", "attempts", "added_at"}
+        self.stats = {"requests": 0, "succeeded": 0, "retried": 0, "dropped": 0}
+
+    def add(self, entry_id, on_success=None, **fields):
+        """Queue a MessageBody (send) or ReceiptHandle (delete) under a batch-unique entry id"""
+        if entry_id in self.pending:
+            return  # already queued: never send the same entry twice
+        self.pending[entry_id] = {"entry": dict(fields, Id=entry_id), "on_success": on_success,
+                                  "attempts": 0, "added_at": time.time()}
+        if len(self.pending) >= 10:
+            self.flush()
+
+    def flush_due(self):
+        if self.pending and time.time() - min(p["added_at"] for p in self.pending.values()) >= self.max_wait:
+            self.flush()
+
+    def flush(self):
+        """Send every pending entry now, 10 per request"""
+        ids = list(self.pending)
+        for i in range(0, len(ids), 10):
+            self._flush_chunk(ids[i:i + 10])
+
+    def _flush_chunk(self, ids):
+        entries = [self.pending[entry_id]["entry"] for entry_id in ids]
+        operation = sqs_client.send_message_batch if self.action == "send" else sqs_client.delete_message_batch
+        self.stats["requests"] += 1
+        try:
+            response = operation(QueueUrl=self.queue_url, Entries=entries)
+        except Exception as e:
+            # Nothing is known to have succeeded: every entry stays queued for the next flush
+            response = {"Failed": [{"Id": entry_id, "SenderFault": False, "Message": str(e)} for entry_id in ids]}
+        for result in response.get("Successful", []):
+            pending = self.pending.pop(result["Id"])
+            self.stats["succeeded"] += 1
+            if pending["on_success"]:
+                pending["on_success"](result["Id"])
+        for result in response.get("Failed", []):
+            pending = self.pending[result["Id"]]
+            pending["attempts"] += 1
+            if result.get("SenderFault") or pending["attempts"] >= self.max_attempts:
+                del self.pending[result["Id"]]
+                self.stats["dropped"] += 1
+                print(f"⚠️  SQS batch {self.action} failed for entry {result['Id']} after "
+                      f"{pending['attempts']} attempt(s): {result.get('Message')}")
+            else:
+                self.stats["retried"] += 1
+
+class ScreeningEngine:
+    """Fans SQS video messages out to a process pool, tracking each message's visibility timeout"""
+
+    def __init__(self, workers=SCREENING_WORKERS):
+        self.workers = max(1, workers)
+        self.executor = self._new_executor()
+        self.in_flight = {}  # Future -> message state
+        self.forwarding = {}  # message id -> state of a screened video whose GPU message isn't confirmed yet
+        # An input message is deleted only after its GPU-queue message was accepted, so a crash in between
+        # means SQS redelivers it (at-least-once) instead of the video being lost
+        self.gpu_batcher = SQSBatcher(SQS_GPU_QUEUE_URL, "send") if SQS_GPU_QUEUE_URL else None
+        self.delete_batcher = SQSBatcher(SQS_VIDEO_QUEUE_URL, "delete")
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_screening_worker,
+            initargs=(worker_segment_threads(self.workers),)
+        )
+
+    def receive(self):
+        """Pull up to 10 messages per call, only as many as there are idle workers"""
+        capacity = self.workers - len(self.in_flight)
+        while capacity > 0:
+            response = sqs_client.receive_message(
+                QueueUrl=SQS_VIDEO_QUEUE_URL,
+                MaxNumberOfMessages=min(SQS_RECEIVE_BATCH_SIZE, capacity),
+                WaitTimeSeconds=1 if self.in_flight or self.has_pending() else 20,  # Long polling only while idle
+                VisibilityTimeout=SQS_VISIBILITY_TIMEOUT
+            )
+            messages = response.get('Messages', [])
+            if not messages:
+                return
+            now = time.time()
+            for message in messages:
+                try:
+                    body = json.loads(message['Body'])
+                except Exception as e:
+                    print(f"❌ Error parsing message {message.get('MessageId')}: {e}")
+                    continue  # Message will become visible again after VisibilityTimeout
+                state = {
+                    "message_id": message['MessageId'],
+                    "receipt_handle": message['ReceiptHandle'],
+                    "video_id": body.get('video_id'),
+                    "s3_key": body.get('s3_key'),
+                    "received_at": now,
+                    "visible_until": now + SQS_VISIBILITY_TIMEOUT
+                }
+                print(f"📹 Processing video: {state['video_id']}")
+                self.in_flight[self.executor.submit(screen_s3_video, state["s3_key"])] = state
+            capacity = self.workers - len(self.in_flight)
+
+    def collect(self, timeout=1.0):
+        """Finalize videos whose worker finished; failed ones are left for SQS to redeliver"""
+        if not self.in_flight:
+            return
+        done, _ = wait(list(self.in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+        pool_broken = False
+        for future in done:
+            state = self.in_flight.pop(future)
+            try:
+                frame_features, sampling_stats = future.result()
+                try:
+                    forwarded = finalize_screening(state["video_id"], state["s3_key"],
+                                                   fetch_video_filename(state["video_id"]), frame_features,
+                                                   sampling_stats, forward_to_gpu=self.forwarder(state))
+                finally:
+                    publish_frame_artifact(sampling_stats, None, False)  # drop a staged artifact left by a failure
+                if not forwarded:
+                    self.delete(state)
+                print(f"⏱️  Video {state['video_id']} screened in {time.time() - state['received_at']:.1f}s")
+            except BrokenProcessPool as e:
+                print(f"❌ Screening worker died while processing {state['video_id']}: {e}")
+                pool_broken = True
+            except Exception as e:
+                print(f"❌ Error processing message: {e}")
+                # Message will become visible again after VisibilityTimeout
+        if pool_broken:
+            # A crashed worker breaks the whole pool; its other messages will be redelivered by SQS
+            self.in_flight.clear()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = self._new_executor()
+
+    def extend_visibility(self):
+        """Keep in-flight messages invisible while their video is still being screened"""
+        now = time.time()
+        expiring = [s for s in self.in_flight.values() if s["visible_until"] - now < SQS_VISIBILITY_MARGIN]
+        for i in range(0, len(expiring), 10):
+            chunk = {s["message_id"]: s for s in expiring[i:i + 10]}
+            response = sqs_client.change_message_visibility_batch(
+                QueueUrl=SQS_VIDEO_QUEUE_URL,
+                Entries=[
+                    {"Id": message_id, "ReceiptHandle": s["receipt_handle"], "VisibilityTimeout": SQS_VISIBILITY_TIMEOUT}
+                    for message_id, s in chunk.items()
+                ]
+            )
+            for entry in response.get('Successful', []):
+                chunk[entry['Id']]["visible_until"] = now + SQS_VISIBILITY_TIMEOUT
+            for entry in response.get('Failed', []):
+                print(f"⚠️  Failed to extend visibility for {chunk[entry['Id']]['video_id']}: {entry.get('Message')}")
+
+    def forwarder(self, state):
+        """forward_to_gpu callback for finalize_screening: batch the GPU message, delete the input after it"""
+        if not self.gpu_batcher:
+            return None
+
+        def forward(message_body):
+            fields = {"MessageBody": message_body}
+            if SQS_GPU_QUEUE_URL.endswith(".fifo"):
+                fields.update(MessageGroupId=state["video_id"], MessageDeduplicationId=state["message_id"])
+            self.forwarding[state["message_id"]] = state
+            self.gpu_batcher.add(state["message_id"], on_success=self.forwarded, **fields)
+        return forward
+
+    def forwarded(self, message_id):
+        self.delete(self.forwarding.pop(message_id))
+
+    def delete(self, state):
+        self.delete_batcher.add(state["message_id"], ReceiptHandle=state["receipt_handle"])
+
+    def has_pending(self):
+        return bool(self.delete_batcher.pending or (self.gpu_batcher and self.gpu_batcher.pending))
+
+    def flush(self, force=False):
+        """Flush GPU sends before input deletes; partial batches wait up to SQS_BATCH_MAX_WAIT_SECONDS"""
+        for batcher in (self.gpu_batcher, self.delete_batcher):
+            if batcher:
+                batcher.flush() if force else batcher.flush_due()
+        # A GPU message dropped after its retries leaves the input message to be redelivered
+        if self.gpu_batcher:
+            for message_id in set(self.forwarding) - set(self.gpu_batcher.pending):
+                print(f"⚠️  GPU forward for {self.forwarding.pop(message_id)['video_id']} failed; "
+                      f"leaving the input message for redelivery")
+
+    def run_once(self):
+        self.receive()
+        self.collect()
+        self.extend_visibility()
+        self.flush()
+
 # Background worker to poll SQS
 def poll_sqs_queue():
     """Background worker that continuously polls SQS for new videos to screen"""
     print("🚀 Starting SQS polling worker for Fast Screening...")
+    engine = None
     
     while True:
         try:
@@ -242,162 +1805,12 @@ def poll_sqs_queue():
                 time.sleep(30)
                 continue
             
-            # Poll SQS for messages
-            response = sqs_client.receive_message(
-                QueueUrl=SQS_VIDEO_QUEUE_URL,
-                MaxNumberOfMessages=1,
-                WaitTimeSeconds=20,  # Long polling
-                VisibilityTimeout=300  # 5 minutes to process
-            )
+            if engine is None:
+                engine = ScreeningEngine()
+                print(f"⚙️  Screening engine running with {engine.workers} worker processes "
+                      f"x {worker_segment_threads(engine.workers)} segment threads ({available_cpus()} CPUs)")
             
-            messages = response.get('Messages', [])
-            
-            if not messages:
-                continue  # No messages, continue polling
-            
-            for message in messages:
-                try:
-                    # Parse message
-                    body = json.loads(message['Body'])
-                    video_id = body.get('video_id')
-                    s3_key = body.get('s3_key')
-                    
-                    print(f"📹 Processing video: {video_id}")
-                    
-                    # Fetch video metadata from DynamoDB to get filename
-                    try:
-                        video_response = videos_table.get_item(Key={"video_id": video_id})
-                        filename = video_response.get('Item', {}).get('filename', '')
-                    except Exception as e:
-                        print(f"⚠️  Failed to fetch video metadata: {e}")
-                        filename = ''
-                    
-                    # Download video from S3 to temp file
-                    with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as tmp_file:
-                        s3_client.download_fileobj(S3_BUCKET_NAME, s3_key, tmp_file)
-                        tmp_path = tmp_file.name
-                    
-                    # Process video using existing screen_video logic
-                    cap = cv2.VideoCapture(tmp_path)
-                    fps = cap.get(cv2.CAP_PROP_FPS)
-                    interval = int(fps * 2) if fps > 0 else 30
-                    
-                    frame_features = []
-                    count = 0
-                    
-                    while cap.isOpened():
-                        ret, frame = cap.read()
-                        if not ret:
-                            break
-                        if count % interval == 0:
-                            features = extract_frame_features(frame)
-                            frame_features.append(features)
-                        count += 1
-                    
-                    cap.release()
-                    
-                    # Clean up temp file
-                    os.unlink(tmp_path)
-                    
-                    if frame_features:
-                        # Calculate risk score
-                        risk_score = calculate_risk_score(frame_features)
-                        
-                        # Use filename from DynamoDB (already fetched above)
-                        filename_lower = filename.lower() if filename else ""
-                        
-                        # Check for violent keywords in filename
-                        violent_keywords = ['violent', 'violence', 'kill', 'killing', 'action', 'gun', 'weapon', 
-                                           'fight', 'fighting', 'blood', 'bloody', 'war', 'warfare', 'combat',
-                                           'shoot', 'shooting', 'attack', 'assault', 'murder', 'death', 'dead',
-                                           'wick', 'action scene', 'battle', 'battleground']
-                        has_violent_keyword = any(keyword in filename_lower for keyword in violent_keywords)
-                        
-                        # Force GPU analysis if filename suggests violence OR risk score > 0.15 (lowered from 0.3)
-                        needs_gpu = risk_score > 0.15 or has_violent_keyword
-                        
-                        if has_violent_keyword:
-                            print(f"⚠️  Video {video_id} contains violent keywords in filename, forcing GPU analysis")
-                            # Boost risk score for violent keywords to ensure proper handling
-                            risk_score = max(risk_score, 0.25)
-                        
-                        # Update video record in DynamoDB
-                        videos_table.update_item(
-                            Key={"video_id": video_id},
-                            UpdateExpression="SET #status = :status, risk_score = :risk_score, screening_type = :screening_type, frames_analyzed = :frames_analyzed, screened_at = :screened_at",
-                            ExpressionAttributeNames={"#status": "status"},
-                            ExpressionAttributeValues={
-                                ":status": "gpu_queued" if needs_gpu else "screened",
-                                ":risk_score": Decimal(str(risk_score)),
-                                ":screening_type": "cpu",
-                                ":frames_analyzed": len(frame_features),
-                                ":screened_at": datetime.utcnow().isoformat()
-                            }
-                        )
-                        
-                        # Log screening event
-                        events_table.put_item(
-                            Item={
-                                "event_id": f"{video_id}_{int(datetime.utcnow().timestamp() * 1000)}",
-                                "video_id": video_id,
-                                "event_type": "screen",
-                                "event_data": {
-                                    "risk_score": str(risk_score),
-                                    "screening_type": "cpu",
-                                    "frames_analyzed": len(frame_features),
-                                    "needs_gpu": needs_gpu
-                                },
-                                "timestamp": datetime.utcnow().isoformat(),
-                                "ttl": int(datetime.utcnow().timestamp()) + (90 * 24 * 60 * 60)
-                            }
-                        )
-                        
-                        # Send to GPU queue if high risk
-                        if needs_gpu and SQS_GPU_QUEUE_URL:
-                            sqs_client.send_message(
-                                QueueUrl=SQS_GPU_QUEUE_URL,
-                                MessageBody=json.dumps({
-                                    "video_id": video_id,
-                                    "s3_key": s3_key,
-                                    "risk_score": str(risk_score),
-                                    "priority": "high" if risk_score > 0.7 else "normal"
-                                })
-                            )
-                        else:
-                            # Trigger policy engine for low-risk videos so they get immediate AUTO APPROVE
-                            try:
-                                import requests
-                                response = requests.post(
-                                    f"{POLICY_ENGINE_URL}/decide",
-                                    json={
-                                        "video_id": video_id,
-                                        "risk_score": float(risk_score),
-                                        "nsfw_score": 0.0,
-                                        "violence_score": 0.0,
-                                        "hate_speech_score": 0.0,
-                                    },
-                                    timeout=10.0,
-                                )
-                                if response.status_code == 200:
-                                    print(f"✅ Policy engine triggered for {video_id}: {response.json()}")
-                                else:
-                                    print(f"⚠️  Policy engine returned {response.status_code}: {response.text}")
-                            except Exception as e:
-                                print(f"❌ Failed to trigger policy for low-risk video: {e}")
-                                import traceback
-                                traceback.print_exc()
-
-                        print(f"✅ Screened video {video_id}: risk_score={risk_score:.3f}, needs_gpu={needs_gpu}")
-                    
-                    # Delete message from queue
-                    sqs_client.delete_message(
-                        QueueUrl=SQS_VIDEO_QUEUE_URL,
-                        ReceiptHandle=message['ReceiptHandle']
-                    )
-                    
-                except Exception as e:
-                    print(f"❌ Error processing message: {e}")
-                    # Message will become visible again after VisibilityTimeout
+            engine.run_once()
         
         except Exception as e:
             print(f"❌ Error polling SQS: {e}")
@@ -408,4 +1821,12 @@ async def startup_event():
     """Start background worker on app startup"""
     worker_thread = threading.Thread(target=poll_sqs_queue, daemon=True)
     worker_thread.start()
+    if escalation_controller:
+        threading.Thread(target=escalation_controller.run, daemon=True).start()
     print("✅ Fast Screening service started with SQS polling worker")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled HTTP connections"""
+    await policy_client.aclose()
+    policy_session.close()
@@ -0,0 +1,223 @@
+"""Bulk screening: screen every video under a local directory or an S3 prefix and write JSONL results.
+
+Videos are screened in parallel worker processes (one video per process, no segment threads) with
+the same sampling, features and risk score as the service. Each result is appended to the output
+file as soon as it is ready, so the output doubles as the checkpoint: rerunning the same command
+skips every source already in it (failed ones too, unless --retry-errors) and appends the rest.
+If a worker process dies (e.g. OOM-killed), the videos in flight are recorded as errors and the
+pool is rebuilt. Nothing is written to DynamoDB or the queues.
+
+Usage:
+    python batch_screen.py /data/archive --output archive.jsonl --workers 8
+    python batch_screen.py s3://guardian-videos/videos/2024/ --output backfill.jsonl
+    python batch_screen.py bench_videos --output /tmp/bench.jsonl --fresh   # throughput on this machine
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import app
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".m4v", ".mkv", ".avi", ".webm")
+
+
+def list_sources(root):
+    """Yield (source, size_bytes) for every video under a directory or s3://bucket/prefix, in name order"""
+    if root.startswith("s3://"):
+        bucket, _, prefix = root[len("s3://"):].partition("/")
+        paginator = app.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for item in page.get("Contents", []):
+                if item["Key"].lower().endswith(VIDEO_EXTENSIONS):
+                    yield f"s3://{bucket}/{item['Key']}", item["Size"]
+        return
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        for name in sorted(files):
+            if name.lower().endswith(VIDEO_EXTENSIONS):
+                path = os.path.join(directory, name)
+                yield path, os.path.getsize(path)
+
+
+def screen_source(source, mode):
+    """Screen one local path or s3:// URI; runs in a worker process"""
+    start = time.perf_counter()
+    stats = {}
+    if source.startswith("s3://"):
+        bucket, _, key = source[len("s3://"):].partition("/")
+        with app.local_video(bucket, key, stats) as path:
+            frame_features, sampling_stats = app.collect_frame_features(path, mode=mode, segment_workers=1)
+    else:
+        frame_features, sampling_stats = app.collect_frame_features(source, mode=mode, segment_workers=1)
+    if len(frame_features) == 0:
+        raise ValueError("No frames analyzed")
+    fps = sampling_stats.get("fps", 0)
+    result = {
+        "source": source,
+        "video_id": os.path.splitext(os.path.basename(source))[0],
+        "risk_score": app.calculate_risk_score(frame_features),
+        "frames_analyzed": len(frame_features),
+        "frames_decoded": sampling_stats.get("frames_decoded", 0),  # every grabbed frame is decoded
+        "frames_converted": sampling_stats.get("frames_converted", 0),
+        "duration_seconds": round(sampling_stats.get("frame_count", 0) / fps, 3) if fps else None,
+        "sampling_mode": sampling_stats.get("mode"),
+        "segment_hints": sampling_stats.get("segment_hints", []),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    # Escalation without the filename keywords or the backlog boost, which depend on where a video came from
+    model_result = app.screening_model.score(frame_features) if app.screening_model else None
+    if model_result:
+        result.update(escalate=model_result["escalation_score"] >= model_result["threshold"],
+                      escalation_score=model_result["escalation_score"],
+                      screening_model=model_result["model_version"])
+    else:
+        result["escalate"] = result["risk_score"] > app.RISK_ESCALATION_THRESHOLD
+    if "download" in stats:
+        result["download_seconds"] = stats["download"]["seconds"]
+    return result
+
+
+def load_checkpoint(output, retry_errors):
+    """Sources already in the output file, keeping only the last record per source.
+
+    With retry_errors, failed records are dropped so their retry replaces them. A torn last line left
+    by an interrupted run is dropped too; the file is rewritten only when something was removed.
+    """
+    if not os.path.exists(output):
+        return set()
+    records = {}
+    lines = 0
+    torn = False
+    with open(output, "rb") as f:
+        for line in f:
+            try:
+                record = json.loads(line) if line.endswith(b"\n") else None
+            except ValueError:
+                record = None
+            if record is None:
+                torn = True
+                break
+            lines += 1
+            records.pop(record["source"], None)  # a later record for the same source wins
+            records[record["source"]] = (record, line)
+    if retry_errors:
+        records = {source: kept for source, kept in records.items() if "error" not in kept[0]}
+    if torn or len(records) < lines:
+        tmp = f"{output}.tmp"
+        with open(tmp, "wb") as f:
+            f.writelines(line for _, line in records.values())
+        os.replace(tmp, output)
+    return set(records)
+
+
+class Throughput:
+    """Running totals for the progress line and the final report"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.videos = self.errors = self.frames = self.bytes = 0
+        self.video_seconds = 0.0
+
+    def add(self, result, size):
+        self.videos += 1
+        self.bytes += size
+        if "error" in result:
+            self.errors += 1
+            return
+        self.frames += result["frames_decoded"]
+        self.video_seconds += result["duration_seconds"] or 0.0
+
+    def report(self, pending=0):
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return (f"{self.videos} videos ({self.errors} failed, {pending} pending) in {elapsed:.1f}s: "
+                f"{self.videos / elapsed:.2f} videos/s, {self.frames / elapsed:.0f} decoded frames/s, "
+                f"{self.bytes / elapsed / 1e6:.1f} MB/s, {self.video_seconds / elapsed:.1f}x realtime")
+
+
+def new_executor(workers):
+    return ProcessPoolExecutor(max_workers=max(1, workers), mp_context=multiprocessing.get_context("spawn"),
+                               initializer=app.init_screening_worker)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="Local directory or s3://bucket/prefix")
+    parser.add_argument("--output", required=True, help="JSONL results (also the resume checkpoint)")
+    parser.add_argument("--workers", type=int, default=app.available_cpus(), help="Worker processes")
+    parser.add_argument("--mode", choices=app.SAMPLING_MODES, default=app.SAMPLING_MODE)
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many new videos (0 = all)")
+    parser.add_argument("--retry-errors", action="store_true", help="Re-screen sources that failed last time")
+    parser.add_argument("--fresh", action="store_true", help="Ignore and overwrite an existing output file")
+    parser.add_argument("--progress-seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    if args.fresh and os.path.exists(args.output):
+        os.unlink(args.output)
+    done = load_checkpoint(args.output, args.retry_errors)
+    if done:
+        print(f"↩️  Resuming: {len(done)} sources already in {args.output}")
+
+    sources = ((source, size) for source, size in list_sources(args.root) if source not in done)
+    throughput = Throughput()
+    in_flight = {}
+    submitted = 0
+    retry_item = None  # a source whose submit hit a broken pool; resubmitted to the rebuilt one
+    last_progress = time.perf_counter()
+    executor = new_executor(args.workers)
+    print(f"🚀 Screening {args.root} with {args.workers} worker processes (mode={args.mode})")
+    try:
+        with open(args.output, "a") as output:
+            exhausted = False
+            while True:
+                # Keep two videos queued per worker so listing a huge prefix never runs far ahead
+                while (retry_item or not exhausted) and len(in_flight) < 2 * args.workers \
+                        and not (args.limit and submitted >= args.limit):
+                    item, retry_item = retry_item or next(sources, None), None
+                    if item is None:
+                        exhausted = True
+                        break
+                    try:
+                        in_flight[executor.submit(screen_source, item[0], args.mode)] = item
+                    except BrokenProcessPool:
+                        retry_item = item
+                        break
+                    submitted += 1
+                if not in_flight and retry_item is None:
+                    break
+                finished, _ = wait(list(in_flight), timeout=args.progress_seconds, return_when=FIRST_COMPLETED)
+                broken = retry_item is not None or any(isinstance(f.exception(), BrokenProcessPool) for f in finished)
+                if broken:
+                    # A dead worker breaks the whole pool: every video still in flight fails with it
+                    finished = wait(list(in_flight)).done
+                for future in finished:
+                    source, size = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool as e:
+                        print(f"❌ {source}: worker process died ({e})")
+                        result = {"source": source, "error": f"worker process died: {e}"}
+                    except Exception as e:
+                        print(f"❌ {source}: {e}")
+                        result = {"source": source, "error": str(e)}
+                    output.write(json.dumps(result) + "\n")
+                    output.flush()
+                    throughput.add(result, size)
+                if broken:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = new_executor(args.workers)
+                    print("♻️  Process pool rebuilt after a worker process died")
+                if time.perf_counter() - last_progress >= args.progress_seconds:
+                    print(f"⏱️  {throughput.report(len(in_flight))}")
+                    last_progress = time.perf_counter()
+    finally:
+        executor.shutdown()
+
+    print(f"✅ {throughput.report()}")
+
+
+if __name__ == "__main__":
+    main()
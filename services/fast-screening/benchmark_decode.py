@@ -0,0 +1,85 @@
+"""Benchmark decoder backends: OpenCV vs PyAV with FFmpeg frame/slice threading.
+
+Decodes synthetic H.264 clips (or the given videos) with each backend configuration and
+reports frames/s and CPU seconds, both for a full decode (every frame converted to BGR)
+and for the screening sampler (exact 0.5 FPS sampling at ANALYSIS_MAX_HEIGHT).
+
+Usage:
+    python benchmark_decode.py                               # synthetic 360p/720p/1080p/1440p H.264
+    python benchmark_decode.py --threads 4 --output-height 360 video.mp4
+"""
+import argparse
+import os
+import time
+import cv2
+
+from app import ANALYSIS_MAX_HEIGHT, PyAVCapture, sample_frames
+from synthetic_videos import write_synthetic_h264
+
+
+def backend_configs(threads, output_height):
+    """(name, factory) pairs; each factory opens a cv2.VideoCapture-like handle"""
+    configs = [
+        ("opencv", lambda path: cv2.VideoCapture(path)),
+        ("opencv-1t", lambda path: cv2.VideoCapture(path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_N_THREADS, 1])),
+    ]
+    for thread_type in ("NONE", "SLICE", "FRAME", "AUTO"):
+        configs.append((f"pyav-{thread_type.lower()}",
+                        lambda path, t=thread_type: PyAVCapture(path, thread_type=t, thread_count=threads)))
+    if output_height:
+        configs.append((f"pyav-auto-{output_height}p",
+                        lambda path: PyAVCapture(path, thread_type="AUTO", thread_count=threads,
+                                                 output_max_height=output_height)))
+    return configs
+
+
+def full_decode(cap):
+    frames = 0
+    while True:
+        ret, _ = cap.read()
+        if not ret:
+            return frames
+        frames += 1
+
+
+def sampled_decode(cap):
+    stats = {}
+    sum(1 for _ in sample_frames(cap, mode="exact", stats=stats, max_height=ANALYSIS_MAX_HEIGHT))
+    return stats["frames_grabbed"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("videos", nargs="*", help="Video files (default: generate synthetic H.264 clips)")
+    parser.add_argument("--threads", type=int, default=0, help="PyAV codec threads (0 = FFmpeg default)")
+    parser.add_argument("--output-height", type=int, default=360, help="Extra PyAV run with scaled output (0 = off)")
+    parser.add_argument("--seconds", type=int, default=20, help="Length of synthetic clips")
+    parser.add_argument("--workdir", default="bench_videos")
+    args = parser.parse_args()
+
+    videos = args.videos
+    if not videos:
+        os.makedirs(args.workdir, exist_ok=True)
+        videos = []
+        for width, height in ((640, 360), (1280, 720), (1920, 1080), (2560, 1440)):
+            path = os.path.join(args.workdir, f"h264_{width}x{height}.mp4")
+            if not os.path.exists(path):
+                write_synthetic_h264(path, width, height, seconds=args.seconds, seed=width, cut_every=3.0)
+            videos.append(path)
+
+    print(f"{os.cpu_count()} CPUs visible")
+    print(f"{'video':<24} {'backend':<16} {'workload':<8} {'frames':>7} {'wall_s':>7} {'cpu_s':>7} {'fps':>8}")
+    for path in videos:
+        for name, open_capture in backend_configs(args.threads, args.output_height):
+            for workload, run in (("full", full_decode), ("sampled", sampled_decode)):
+                cap = open_capture(path)
+                start_wall, start_cpu = time.perf_counter(), time.process_time()
+                frames = run(cap)
+                wall, cpu = time.perf_counter() - start_wall, time.process_time() - start_cpu
+                cap.release()
+                print(f"{os.path.basename(path)[:24]:<24} {name:<16} {workload:<8} {frames:>7} {wall:>7.2f} "
+                      f"{cpu:>7.2f} {frames / wall if wall else 0:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
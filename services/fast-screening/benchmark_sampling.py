@@ -0,0 +1,72 @@
+"""Benchmark frame sampling modes: frames decoded, frames converted to BGR and wall time per video.
+
+"decoded" counts every frame the codec produced (grab() decodes too), "converted" the ones
+turned into BGR images. Seek mode decodes one keyframe per sample point (PyAV) and reports
+how far before its sample point the furthest keyframe was.
+
+Usage:
+    python benchmark_sampling.py                      # synthetic videos in ./bench_videos
+    python benchmark_sampling.py video1.mp4 video2.mp4
+"""
+import argparse
+import os
+import time
+import cv2
+
+from app import SAMPLING_MODES, SAMPLE_INTERVAL_SECONDS, open_video, sample_frames, sampling_interval_frames
+from synthetic_videos import default_video_set
+
+
+def run_legacy_read(path, interval_seconds):
+    """Baseline: cap.read() on every frame, keep one in `interval` (the pre-sampler behaviour)"""
+    cap = cv2.VideoCapture(path)
+    interval = sampling_interval_frames(cap.get(cv2.CAP_PROP_FPS), interval_seconds)
+    decoded = sampled = count = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        decoded += 1
+        if count % interval == 0:
+            sampled += 1
+        count += 1
+    cap.release()
+    return {"frames_decoded": decoded, "frames_converted": decoded, "frames_sampled": sampled}
+
+
+def run_mode(path, mode, interval_seconds):
+    cap = open_video(path, backend="pyav" if mode == "seek" else "opencv")
+    stats = {}
+    sampled = sum(1 for _ in sample_frames(cap, mode=mode, interval_seconds=interval_seconds, stats=stats))
+    cap.release()
+    stats["frames_sampled"] = sampled
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("videos", nargs="*", help="Video files (default: generate synthetic videos)")
+    parser.add_argument("--interval", type=float, default=SAMPLE_INTERVAL_SECONDS, help="Seconds between samples")
+    parser.add_argument("--workdir", default="bench_videos", help="Where synthetic videos are written")
+    parser.add_argument("--seconds", type=int, default=60, help="Length of synthetic videos")
+    args = parser.parse_args()
+
+    videos = args.videos or default_video_set(args.workdir, resolutions=((1280, 720), (1920, 1080)),
+                                              seconds=args.seconds)
+
+    print(f"{'video':<32} {'mode':<8} {'sampled':>8} {'decoded':>8} {'converted':>9} {'seeks':>6} "
+          f"{'max_offset_s':>12} {'wall_s':>8}")
+    for path in videos:
+        runs = [("read", lambda: run_legacy_read(path, args.interval))]
+        runs += [(mode, lambda mode=mode: run_mode(path, mode, args.interval)) for mode in SAMPLING_MODES]
+        for name, run in runs:
+            start = time.perf_counter()
+            stats = run()
+            elapsed = time.perf_counter() - start
+            print(f"{os.path.basename(path)[:32]:<32} {name:<8} {stats['frames_sampled']:>8} "
+                  f"{stats['frames_decoded']:>8} {stats['frames_converted']:>9} {stats.get('seeks', 0):>6} "
+                  f"{stats.get('max_seek_offset_seconds', 0.0):>12.2f} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
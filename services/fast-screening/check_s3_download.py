@@ -0,0 +1,129 @@
+"""Check download_s3_object against a local S3 stand-in behind a latency-injecting proxy.
+
+Point the AWS SDK at any S3-compatible endpoint (moto server, MinIO, LocalStack):
+
+    moto_server -p 5000 &
+    AWS_ENDPOINT_URL=http://127.0.0.1:5000 AWS_ACCESS_KEY_ID=x AWS_SECRET_ACCESS_KEY=x \\
+        S3_BUCKET_NAME=screening-test python check_s3_download.py --latency-ms 40 --stream-mbps 20
+
+Uploads a random object, then downloads it through a TCP proxy that adds a round trip
+of latency to every request and caps each connection's throughput (like a single S3
+GET stream). Every TransferConfig in the grid is tried into a preallocated file and
+into a preallocated buffer. Exits non-zero on a content mismatch, or if a bandwidth-capped
+run exceeds its cap by more than 25%.
+"""
+import argparse
+import hashlib
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+import boto3
+
+import app
+
+
+class LatencyProxy:
+    """TCP proxy adding `latency` seconds before each response and capping per-connection throughput"""
+
+    def __init__(self, upstream_host, upstream_port, latency, stream_bytes_per_s=0):
+        self.upstream = (upstream_host, upstream_port)
+        self.latency = latency
+        self.stream_bytes_per_s = stream_bytes_per_s
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.port = self.server.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            client, _ = self.server.accept()
+            upstream = socket.create_connection(self.upstream)
+            request_sent = threading.Event()
+            threading.Thread(target=self._pipe, args=(client, upstream, request_sent, False), daemon=True).start()
+            threading.Thread(target=self._pipe, args=(upstream, client, request_sent, True), daemon=True).start()
+
+    def _pipe(self, source, sink, request_sent, is_response):
+        try:
+            while True:
+                data = source.recv(64 * 1024)
+                if not data:
+                    break
+                if not is_response:
+                    request_sent.set()
+                else:
+                    if request_sent.is_set():
+                        # First bytes of a response: one round trip of latency
+                        request_sent.clear()
+                        time.sleep(self.latency)
+                    if self.stream_bytes_per_s:
+                        time.sleep(len(data) / self.stream_bytes_per_s)
+                sink.sendall(data)
+        except OSError:
+            pass
+        finally:
+            for sock in (source, sink):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=64, help="Size of the test object")
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="Latency added to every request")
+    parser.add_argument("--stream-mbps", type=float, default=20.0, help="Per-connection cap in MB/s (0 = none)")
+    parser.add_argument("--bandwidth-cap-mbps", type=float, default=30.0, help="max_bandwidth for the capped run")
+    args = parser.parse_args()
+
+    endpoint = urlparse(os.environ["AWS_ENDPOINT_URL"])
+    proxy = LatencyProxy(endpoint.hostname, endpoint.port or 80, args.latency_ms / 1000.0,
+                         int(args.stream_mbps * 1e6))
+
+    bucket = app.S3_BUCKET_NAME
+    try:
+        app.s3_client.create_bucket(Bucket=bucket, CreateBucketConfiguration={"LocationConstraint": app.AWS_REGION})
+    except app.s3_client.exceptions.BucketAlreadyOwnedByYou:
+        pass
+    payload = os.urandom(args.size_mb * 1024 * 1024)
+    expected = hashlib.sha256(payload).hexdigest()
+    key = "videos/download-check.bin"
+    app.s3_client.put_object(Bucket=bucket, Key=key, Body=payload)
+
+    # Route the helper's client (shared video_io module) through the proxy
+    app.video_io.s3_client = boto3.client("s3", region_name=app.AWS_REGION,
+                                          endpoint_url=f"http://127.0.0.1:{proxy.port}")
+
+    MB = 1024 * 1024
+    grid = [("1 stream", 8 * MB, 1, 0), ("boto3 default", 8 * MB, 10, 0), ("4 x 16MB", 16 * MB, 4, 0),
+            ("8 x 8MB", 8 * MB, 8, 0), ("16 x 4MB", 4 * MB, 16, 0),
+            ("8 x 8MB capped", 8 * MB, 8, int(args.bandwidth_cap_mbps * 1e6))]
+    failures = 0
+    print(f"{'config':<16} {'target':<7} {'MB':>6} {'seconds':>8} {'MB/s':>7} {'ok':>3}")
+    for name, part_bytes, concurrency, max_bandwidth in grid:
+        config = app.s3_transfer_config(part_bytes, concurrency, max_bandwidth)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "video.bin")
+            file_metrics = app.download_s3_object(bucket, key, path, config)
+            with open(path, "rb") as f:
+                file_ok = hashlib.sha256(f.read()).hexdigest() == expected
+        buffer = bytearray(len(payload))
+        buffer_metrics = app.download_s3_object(bucket, key, buffer, config)
+        buffer_ok = hashlib.sha256(buffer).hexdigest() == expected
+
+        for target, metrics, ok in (("file", file_metrics, file_ok), ("buffer", buffer_metrics, buffer_ok)):
+            if max_bandwidth and metrics["bytes"] / metrics["seconds"] > max_bandwidth * 1.25:
+                ok = False
+            failures += 0 if ok else 1
+            print(f"{name:<16} {target:<7} {metrics['bytes'] / 1e6:>6.1f} {metrics['seconds']:>8.2f} "
+                  f"{metrics['mb_per_s']:>7.1f} {'✅' if ok else '❌':>3}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Check streamed S3 screening against the temp-file path using a local S3 stand-in.
+
+Point the AWS SDK at any S3-compatible endpoint (moto server, MinIO, LocalStack):
+
+    moto_server -p 5000 &
+    AWS_ENDPOINT_URL=http://127.0.0.1:5000 AWS_ACCESS_KEY_ID=x AWS_SECRET_ACCESS_KEY=x \\
+        S3_BUCKET_NAME=screening-test python check_s3_streaming.py
+
+Uploads a faststart (moov first) and a regular (moov last) synthetic MP4, screens each
+through screen_s3_video() with streaming on and off, and exits non-zero if the feature
+matrices differ or the moov-last file did not fall back to the temp file. The screening
+cache is disabled so the second run is a real streamed screening, not a cache hit.
+"""
+import os
+import sys
+import time
+import numpy as np
+
+import app
+from synthetic_videos import make_faststart, write_synthetic_video
+
+
+def main():
+    workdir = os.getenv("BENCH_WORKDIR", "bench_videos")
+    os.makedirs(workdir, exist_ok=True)
+    regular = os.path.join(workdir, "stream_regular.mp4")
+    if not os.path.exists(regular):
+        write_synthetic_video(regular, 1280, 720, fps=30, seconds=60, seed=3, cut_every=3.0)
+    faststart = make_faststart(regular, os.path.join(workdir, "stream_faststart.mp4"))
+
+    app.SCREENING_CACHE_ENABLED = False
+    bucket = app.S3_BUCKET_NAME
+    try:
+        app.s3_client.create_bucket(Bucket=bucket, CreateBucketConfiguration={"LocationConstraint": app.AWS_REGION})
+    except app.s3_client.exceptions.BucketAlreadyOwnedByYou:
+        pass
+
+    failures = 0
+    for path, expected_input in ((faststart, "stream"), (regular, "file")):
+        key = f"videos/{os.path.basename(path)}"
+        app.s3_client.upload_file(path, bucket, key)
+
+        app.S3_STREAMING_ENABLED = False
+        start = time.perf_counter()
+        baseline, _ = app.screen_s3_video(key)
+        file_s = time.perf_counter() - start
+
+        app.S3_STREAMING_ENABLED = True
+        start = time.perf_counter()
+        streamed, stats = app.screen_s3_video(key)
+        stream_s = time.perf_counter() - start
+
+        ok = stats["input"] == expected_input and np.array_equal(baseline, streamed)
+        failures += 0 if ok else 1
+        print(f"{'✅' if ok else '❌'} {key}: input={stats['input']} frames={len(streamed)} "
+              f"temp-file={file_s:.2f}s streaming={stream_s:.2f}s")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Parity check: batched feature extraction vs the per-frame extract_frame_features path.
+
+Exits non-zero if any feature or risk score differs by more than the tolerance.
+
+Usage:
+    python parity_features.py                      # synthetic videos in ./bench_videos
+    python parity_features.py video1.mp4 --tolerance 1e-4
+"""
+import argparse
+import sys
+import time
+import cv2
+import numpy as np
+
+from app import (FEATURE_COLUMNS, calculate_risk_score, extract_batch_features, extract_frame_features,
+                 sample_frames)
+from synthetic_videos import default_video_set
+
+
+def sampled_frames(path):
+    cap = cv2.VideoCapture(path)
+    frames = [frame for _, frame in sample_frames(cap)]
+    cap.release()
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("videos", nargs="*", help="Video files (default: generate synthetic videos)")
+    parser.add_argument("--tolerance", type=float, default=1e-4, help="Max absolute difference allowed")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--workdir", default="bench_videos")
+    args = parser.parse_args()
+
+    videos = args.videos or default_video_set(args.workdir, resolutions=((640, 360), (1280, 720)))
+    failures = 0
+    for path in videos:
+        frames = sampled_frames(path)
+        if not frames:
+            print(f"⚠️  {path}: no frames sampled, skipping")
+            continue
+
+        start = time.process_time()
+        legacy = [extract_frame_features(frame) for frame in frames]
+        legacy_cpu = time.process_time() - start
+
+        start = time.process_time()
+        batches = [extract_batch_features(np.stack(frames[i:i + args.batch_size]))
+                   for i in range(0, len(frames), args.batch_size)]
+        matrix = np.concatenate(batches)
+        batch_cpu = time.process_time() - start
+
+        legacy_matrix = np.array([[f[c] for c in FEATURE_COLUMNS] for f in legacy], dtype=np.float64)
+        feature_diff = np.abs(legacy_matrix - matrix.astype(np.float64)).max(axis=0)
+        # Brightness and skin_ratio live on a 0-255 scale, so compare them relative to that range
+        scaled_diff = feature_diff / np.array([1.0, 255.0, 1.0, 255.0])
+        risk_diff = abs(calculate_risk_score(legacy) - calculate_risk_score(matrix))
+
+        ok = risk_diff <= args.tolerance and bool(np.all(scaled_diff <= args.tolerance))
+        failures += 0 if ok else 1
+        diffs = ", ".join(f"{c}={d:.2e}" for c, d in zip(FEATURE_COLUMNS, feature_diff))
+        print(f"{'✅' if ok else '❌'} {path}: frames={len(frames)} risk_diff={risk_diff:.2e} {diffs} "
+              f"cpu legacy={legacy_cpu:.3f}s batch={batch_cpu:.3f}s")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
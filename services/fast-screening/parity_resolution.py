@@ -0,0 +1,66 @@
+"""Accuracy-parity harness: calculate_risk_score at native vs reduced analysis resolution.
+
+For each video and target height, reports the risk-score drift, whether the 0.15 GPU
+escalation decision flips, and CPU seconds per video. Exits non-zero if any drift
+exceeds --max-drift or any decision flips.
+
+With the default OpenCV decoder every frame is still decoded at full size, so a lower
+height only saves feature extraction (about 1.0x CPU on the synthetic set). With
+--backend pyav, codecs that support FFmpeg lowres decode at 1/2-1/8 size ("lowres"
+column: the shift applied); H.264/HEVC are always decoded full-size.
+
+Usage:
+    python parity_resolution.py                         # synthetic 720p/1080p/1440p videos
+    python parity_resolution.py --heights 720 480 360 --backend pyav video.mp4
+"""
+import argparse
+import os
+import sys
+import time
+
+import app
+from app import DECODER_BACKENDS, calculate_risk_score, collect_frame_features
+from synthetic_videos import default_video_set
+
+ESCALATION_THRESHOLD = 0.15
+
+
+def timed_risk(path, max_height):
+    start = time.process_time()
+    features, stats = collect_frame_features(path, max_height=max_height)
+    cpu = time.process_time() - start
+    return calculate_risk_score(features) if len(features) else 0.0, cpu, stats.get("decoder_lowres", 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("videos", nargs="*", help="Video files (default: generate synthetic videos)")
+    parser.add_argument("--heights", type=int, nargs="+", default=[720, 480, 360], help="Analysis heights to compare")
+    parser.add_argument("--max-drift", type=float, default=0.05, help="Max allowed absolute risk-score drift")
+    parser.add_argument("--backend", choices=DECODER_BACKENDS, default=app.DECODER_BACKEND, help="Video decoder")
+    parser.add_argument("--workdir", default="bench_videos")
+    args = parser.parse_args()
+    app.DECODER_BACKEND = args.backend
+
+    videos = args.videos or default_video_set(args.workdir, resolutions=((1280, 720), (1920, 1080), (2560, 1440)),
+                                              seconds=30)
+    failures = 0
+    print(f"{'video':<32} {'height':>7} {'risk':>7} {'drift':>7} {'flip':>5} {'lowres':>6} {'cpu_s':>7} {'speedup':>8}")
+    for path in videos:
+        native_risk, native_cpu, _ = timed_risk(path, 0)
+        print(f"{os.path.basename(path)[:32]:<32} {'native':>7} {native_risk:>7.4f} {'':>7} {'':>5} {'':>6} "
+              f"{native_cpu:>7.2f} {'':>8}")
+        for height in args.heights:
+            risk, cpu, lowres = timed_risk(path, height)
+            drift = abs(risk - native_risk)
+            flip = (risk > ESCALATION_THRESHOLD) != (native_risk > ESCALATION_THRESHOLD)
+            if drift > args.max_drift or flip:
+                failures += 1
+            print(f"{os.path.basename(path)[:32]:<32} {height:>7} {risk:>7.4f} {drift:>7.4f} {'yes' if flip else 'no':>5} "
+                  f"{lowres:>6} {cpu:>7.2f} {native_cpu / cpu if cpu else 0:>7.1f}x")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
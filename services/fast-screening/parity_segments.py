@@ -0,0 +1,56 @@
+"""Parity check: parallel segment screening vs sequential screening of the same video.
+
+Exits non-zero unless the segmented feature matrix and risk score equal the sequential ones.
+
+Usage:
+    python parity_segments.py                         # synthetic 3-minute video
+    python parity_segments.py --segments 4 long_video.mp4
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+from app import SAMPLING_MODES, calculate_risk_score, collect_frame_features
+from synthetic_videos import write_synthetic_video
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("videos", nargs="*", help="Video files (default: generate a synthetic long video)")
+    parser.add_argument("--segments", type=int, default=4, help="Parallel segments to compare against")
+    parser.add_argument("--workdir", default="bench_videos")
+    args = parser.parse_args()
+
+    videos = args.videos
+    if not videos:
+        os.makedirs(args.workdir, exist_ok=True)
+        path = os.path.join(args.workdir, "long_640x360.mp4")
+        if not os.path.exists(path):
+            write_synthetic_video(path, 640, 360, fps=30, seconds=180, seed=7, cut_every=4.0)
+        videos = [path]
+
+    failures = 0
+    for path in videos:
+        for mode in SAMPLING_MODES:
+            start = time.perf_counter()
+            sequential, _ = collect_frame_features(path, mode=mode, segment_workers=1)
+            sequential_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            segmented, stats = collect_frame_features(path, mode=mode, segment_workers=args.segments)
+            segmented_s = time.perf_counter() - start
+
+            same = sequential.shape == segmented.shape and np.array_equal(sequential, segmented)
+            risk_match = same and calculate_risk_score(sequential) == calculate_risk_score(segmented)
+            failures += 0 if risk_match else 1
+            print(f"{'✅' if risk_match else '❌'} {os.path.basename(path)} mode={mode} segments={stats['segments']} "
+                  f"frames={len(sequential)}/{len(segmented)} wall sequential={sequential_s:.2f}s "
+                  f"segmented={segmented_s:.2f}s")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
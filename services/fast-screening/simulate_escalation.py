@@ -0,0 +1,111 @@
+"""Simulate the backlog-aware escalation controller against synthetic arrival rates.
+
+A discrete-time model (1 s ticks): screened videos arrive as a Poisson process with scenario-dependent
+rate and Beta-distributed risk scores, the ones above the (boosted) threshold join the GPU queue, and
+deep-vision drains it at a fixed capacity. EscalationController.observe sees only the queue depth, like
+the real poller. Each scenario runs with the static threshold and with the controller.
+
+Exits non-zero if, in a scenario the safety bound can absorb, the controlled p99 queueing delay exceeds
+the target by more than 50%, or if the controller raises the threshold when there is no backlog.
+
+Usage:
+    python simulate_escalation.py
+    python simulate_escalation.py --capacity 0.3 --target-delay 300 --seed 3
+"""
+import argparse
+import sys
+from collections import deque
+
+import numpy as np
+
+from app import (ESCALATION_BOOST_STEP, ESCALATION_MAX_BOOST, RISK_ESCALATION_THRESHOLD,
+                 EscalationController)
+
+
+def scenarios(capacity):
+    """(name, rate(t) in videos/s, duration s); capacity is deep-vision's drain rate in videos/s"""
+    return [
+        ("steady", lambda t: 0.8 * capacity, 4 * 3600),
+        ("burst x3 for 30 min", lambda t: 3.0 * capacity if 3600 <= t < 5400 else 0.8 * capacity, 4 * 3600),
+        ("diurnal", lambda t: capacity * (1.1 + 0.8 * np.sin(2 * np.pi * t / (6 * 3600))), 12 * 3600),
+        ("overload x6", lambda t: 6.0 * capacity, 2 * 3600),
+    ]
+
+
+def simulate(rate, duration, capacity, risk_a, risk_b, controller=None, interval=30, seed=0):
+    rng = np.random.default_rng(seed)
+    queue = deque()
+    waits, boosts = [], []
+    arrived = escalated = 0
+    credit = 0.0
+    for t in range(duration):
+        boost = controller.boost if controller else 0.0
+        for risk in rng.beta(risk_a, risk_b, rng.poisson(rate(t))):
+            arrived += 1
+            if risk > RISK_ESCALATION_THRESHOLD + boost:
+                escalated += 1
+                queue.append(t)
+                if controller:
+                    controller.record_escalation()
+        credit += capacity
+        while credit >= 1.0 and queue:
+            waits.append(t - queue.popleft())
+            credit -= 1.0
+        if not queue:
+            credit = min(credit, 1.0)  # idle capacity doesn't accumulate
+        if controller and t % interval == 0:
+            controller.observe(len(queue), float(t))
+        boosts.append(boost)
+    waits.extend(duration - t for t in queue)  # still queued at the end
+    waits = np.array(waits or [0])
+    return {
+        "escalation_rate": escalated / max(arrived, 1),
+        "p99_wait": float(np.percentile(waits, 99)),
+        "max_wait": float(waits.max()),
+        "max_boost": float(max(boosts)),
+        "mean_boost": float(np.mean(boosts)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--capacity", type=float, default=0.5, help="Deep-vision drain rate (videos/s)")
+    parser.add_argument("--target-delay", type=float, default=600.0, help="Target queueing delay (s)")
+    parser.add_argument("--interval", type=int, default=30, help="Controller poll interval (s)")
+    parser.add_argument("--risk-beta", type=float, nargs=2, default=(2.0, 8.0), help="Beta(a, b) of risk scores")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    a, b = args.risk_beta
+    risks = np.random.default_rng(args.seed).beta(a, b, 200_000)
+    base_share = np.mean(risks > RISK_ESCALATION_THRESHOLD)
+    bound_share = np.mean(risks > RISK_ESCALATION_THRESHOLD + ESCALATION_MAX_BOOST)
+
+    failures = 0
+    print(f"{'scenario':<22} {'policy':<10} {'escalated':>9} {'p99_wait':>9} {'max_wait':>9} {'boost':>11}")
+    for name, rate, duration in scenarios(args.capacity):
+        peak = max(rate(t) for t in range(0, duration, 60))
+        # The bound can absorb the scenario if peak arrivals at the maximum boost stay under capacity
+        absorbable = peak * bound_share < args.capacity
+        for policy in ("static", "controlled"):
+            controller = None
+            if policy == "controlled":
+                controller = EscalationController(target_delay=args.target_delay, max_boost=ESCALATION_MAX_BOOST,
+                                                  step=ESCALATION_BOOST_STEP, drain_rate_prior=args.capacity)
+            result = simulate(rate, duration, args.capacity, a, b, controller, args.interval, args.seed)
+            ok = True
+            if policy == "controlled":
+                if absorbable and result["p99_wait"] > args.target_delay * 1.5:
+                    ok = False
+                if peak * base_share < args.capacity * 0.9 and result["max_boost"] > 0:
+                    ok = False  # boosted without a backlog
+            failures += 0 if ok else 1
+            print(f"{name:<22} {policy:<10} {result['escalation_rate']:>9.1%} {result['p99_wait']:>8.0f}s "
+                  f"{result['max_wait']:>8.0f}s {result['mean_boost']:>5.3f}/{result['max_boost']:.3f}"
+                  f"{'' if ok else '  ❌'}{'' if absorbable else '  (beyond safety bound)'}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Synthetic test videos for the fast-screening benchmarks and parity harnesses"""
+import os
+import cv2
+import numpy as np
+
+
+def synthetic_frames(width=1280, height=720, fps=30, seconds=20, seed=0, cut_every=0.0, max_speed=12):
+    """Yield BGR frames with moving shapes, skin-toned patches and optional hard scene cuts.
+
+    cut_every: seconds between scene cuts (0 = one continuous scene).
+    max_speed: max shape movement in pixels per frame.
+    """
+    rng = np.random.default_rng(seed)
+    total_frames = int(fps * seconds)
+    frames_per_scene = int(fps * cut_every) if cut_every > 0 else total_frames
+    background = None
+    for i in range(total_frames):
+        if i % max(1, frames_per_scene) == 0:
+            background = rng.integers(0, 256, size=(3,), dtype=np.uint8)
+            shapes = [
+                (rng.integers(0, width), rng.integers(0, height), rng.integers(20, max(21, height // 4)),
+                 tuple(int(c) for c in rng.integers(0, 256, size=3)),
+                 rng.integers(-max_speed, max_speed + 1), rng.integers(-max_speed, max_speed + 1))
+                for _ in range(6)
+            ]
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[:] = background
+        for x, y, r, color, dx, dy in shapes:
+            cx = int((x + dx * i) % width)
+            cy = int((y + dy * i) % height)
+            cv2.circle(frame, (cx, cy), int(r), color, -1)
+        # Skin-toned rectangle (BGR) so the skin mask has something to find
+        cv2.rectangle(frame, (width // 3, height // 3), (width // 3 + width // 8, height // 3 + height // 6),
+                      (120, 160, 220), -1)
+        noise = rng.integers(0, 24, size=(height // 8, width // 8), dtype=np.uint8)
+        noise = cv2.resize(noise, (width, height), interpolation=cv2.INTER_NEAREST)
+        yield cv2.add(frame, cv2.merge([noise, noise, noise]))
+
+
+def write_synthetic_video(path, width=1280, height=720, fps=30, seconds=20, seed=0, cut_every=0.0, max_speed=12):
+    """Write an MPEG-4 Part 2 MP4 of synthetic_frames with OpenCV's writer"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open video writer for {path}")
+    try:
+        for frame in synthetic_frames(width, height, fps, seconds, seed, cut_every, max_speed):
+            writer.write(frame)
+    finally:
+        writer.release()
+    return path
+
+
+def write_synthetic_h264(path, width=1280, height=720, fps=30, seconds=20, seed=0, cut_every=0.0, max_speed=12,
+                         gop_seconds=2.0):
+    """Write an H.264 MP4 of synthetic_frames with PyAV/libx264 (OpenCV wheels cannot encode H.264)"""
+    import av
+
+    with av.open(path, mode="w") as container:
+        stream = container.add_stream("libx264", rate=fps)
+        stream.width, stream.height, stream.pix_fmt = width, height, "yuv420p"
+        stream.options = {"g": str(int(fps * gop_seconds)), "preset": "veryfast", "crf": "23"}
+        for frame in synthetic_frames(width, height, fps, seconds, seed, cut_every, max_speed):
+            for packet in stream.encode(av.VideoFrame.from_ndarray(frame, format="bgr24")):
+                container.mux(packet)
+        for packet in stream.encode():
+            container.mux(packet)
+    return path
+
+
+def default_video_set(directory, resolutions=((1280, 720),), seconds=20, fps=30):
+    """Create one continuous and one fast-cut video per resolution, returning their paths"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for width, height in resolutions:
+        for name, cut_every, max_speed in (("static", 0.0, 1), ("fastcut", 1.5, 12)):
+            path = os.path.join(directory, f"{name}_{width}x{height}.mp4")
+            if not os.path.exists(path):
+                write_synthetic_video(path, width, height, fps, seconds, seed=width + height, cut_every=cut_every,
+                                      max_speed=max_speed)
+            paths.append(path)
+    return paths
+
+
+def _mp4_boxes(data, start=0, end=None):
+    """Yield (type, offset, header_size, size) for the boxes in data[start:end]"""
+    end = len(data) if end is None else end
+    offset = start
+    while offset + 8 <= end:
+        size = int.from_bytes(data[offset:offset + 4], "big")
+        box_type = bytes(data[offset + 4:offset + 8])
+        header = 8
+        if size == 1:
+            size = int.from_bytes(data[offset + 8:offset + 16], "big")
+            header = 16
+        elif size == 0:
+            size = end - offset
+        yield box_type, offset, header, size
+        offset += size
+
+
+def make_faststart(src, dst):
+    """Rewrite an MP4 so the moov index precedes mdat (what `ffmpeg -movflags +faststart` does)"""
+    data = bytearray(open(src, "rb").read())
+    boxes = list(_mp4_boxes(data))
+    types = [b[0] for b in boxes]
+    if b"moov" not in types or b"mdat" not in types or types.index(b"moov") < types.index(b"mdat"):
+        open(dst, "wb").write(data)
+        return dst
+
+    _, moov_offset, _, moov_size = boxes[types.index(b"moov")]
+    moov = bytearray(data[moov_offset:moov_offset + moov_size])
+    containers = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+    def shift_chunk_offsets(start, end):
+        for box_type, offset, header, size in _mp4_boxes(moov, start, end):
+            if box_type in containers:
+                shift_chunk_offsets(offset + header, offset + size)
+            elif box_type in (b"stco", b"co64"):
+                width = 4 if box_type == b"stco" else 8
+                count = int.from_bytes(moov[offset + header + 4:offset + header + 8], "big")
+                for i in range(count):
+                    pos = offset + header + 8 + i * width
+                    value = int.from_bytes(moov[pos:pos + width], "big") + moov_size
+                    moov[pos:pos + width] = value.to_bytes(width, "big")
+
+    shift_chunk_offsets(8, moov_size)
+    with open(dst, "wb") as out:
+        for box_type, offset, _, size in boxes:
+            if box_type == b"moov":
+                continue
+            out.write(data[offset:offset + size])
+            if box_type == b"ftyp":
+                out.write(moov)
+    return dst
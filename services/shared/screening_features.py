@@ -0,0 +1,74 @@
+"""Screening features shared by fast-screening and mlops/training/train_screening_classifier.py.
+
+The service scores videos and the training script builds its dataset with these same functions,
+so the learned model always sees the features it was trained on.
+"""
+import numpy as np
+
+# Per-frame feature matrix columns produced by fast-screening
+FEATURE_COLUMNS = ("motion", "skin_ratio", "color_variance", "brightness")
+
+# Filename keywords that force deep analysis (and feed the model's violent_keyword input)
+VIOLENT_KEYWORDS = ['violent', 'violence', 'kill', 'killing', 'action', 'gun', 'weapon',
+                    'fight', 'fighting', 'blood', 'bloody', 'war', 'warfare', 'combat',
+                    'shoot', 'shooting', 'attack', 'assault', 'murder', 'death', 'dead',
+                    'wick', 'action scene', 'battle', 'battleground']
+
+def features_to_matrix(frame_features):
+    """Convert a list of extract_frame_features dicts into a feature matrix"""
+    return np.array([[f[c] for c in FEATURE_COLUMNS] for f in frame_features], dtype=np.float32).reshape(-1, len(FEATURE_COLUMNS))
+
+def calculate_risk_score(frame_features):
+    """Calculate risk score using normalized classical ML features with improved violence detection.
+
+    Accepts a feature matrix (see FEATURE_COLUMNS) or a list of per-frame feature dicts.
+    """
+    if not isinstance(frame_features, np.ndarray):
+        frame_features = features_to_matrix(frame_features)
+    motion_scores = frame_features[:, 0].astype(np.float64)
+    skin_ratios = frame_features[:, 1].astype(np.float64)
+    color_variances = frame_features[:, 2].astype(np.float64)
+
+    # Normalize and clamp each feature to 0-1
+    motion = float(np.clip(np.mean(motion_scores), 0.0, 1.0))
+    skin = float(np.clip(np.mean(skin_ratios), 0.0, 1.0))
+    # Empirical scale to keep color variance in a reasonable range
+    color = float(np.clip(np.mean(color_variances) / 0.5, 0.0, 1.0))
+    
+    # Detect rapid motion changes (indicator of action/violence)
+    if len(motion_scores) > 1:
+        motion_variance = float(np.std(motion_scores))
+        # High motion variance suggests action/violence scenes
+        motion_volatility = float(np.clip(motion_variance * 2.0, 0.0, 1.0))
+    else:
+        motion_volatility = 0.0
+
+    # Improved weighted risk calculation with higher weight on motion (violence indicator)
+    # Increased motion weight from 0.15 to 0.30, added motion volatility
+    risk = (motion * 0.30) + (motion_volatility * 0.20) + (skin * 0.15) + (color * 0.10)
+    return float(np.clip(risk, 0.0, 1.0))
+
+# Per-video inputs of the learned escalation model
+SCREENING_MODEL_FEATURES = (
+    "motion_mean", "motion_std", "motion_p90", "skin_mean", "skin_std", "color_mean", "color_std",
+    "brightness_mean", "brightness_std", "heuristic_risk", "violent_keyword", "log_frames",
+)
+
+def screening_feature_vector(frame_features, has_violent_keyword=False):
+    """Aggregate a (N, 4) feature matrix into the named per-video features of SCREENING_MODEL_FEATURES"""
+    frame_features = np.asarray(frame_features, dtype=np.float64).reshape(-1, len(FEATURE_COLUMNS))
+    motion, skin, color, brightness = frame_features.T
+    return {
+        "motion_mean": float(np.mean(motion)),
+        "motion_std": float(np.std(motion)),
+        "motion_p90": float(np.percentile(motion, 90)),
+        "skin_mean": float(np.mean(skin)),
+        "skin_std": float(np.std(skin)),
+        "color_mean": float(np.mean(color)),
+        "color_std": float(np.std(color)),
+        "brightness_mean": float(np.mean(brightness)),
+        "brightness_std": float(np.std(brightness)),
+        "heuristic_risk": calculate_risk_score(frame_features),
+        "violent_keyword": 1.0 if has_violent_keyword else 0.0,
+        "log_frames": float(np.log1p(len(frame_features))),
+    }
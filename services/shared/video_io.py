@@ -0,0 +1,430 @@
+"""Video input shared by fast-screening and deep-vision.
+
+PyAV decoding behind the cv2.VideoCapture interface, parallel ranged S3 downloads and the
+node-local video cache both services read through. Each image copies this file next to
+app.py (the two Dockerfiles build from services/); from the source tree, app.py adds
+services/shared to sys.path.
+"""
+import contextlib
+import fcntl
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+
+import boto3
+import cv2
+from boto3.s3.transfer import TransferConfig
+
+try:
+    import av  # PyAV (FFmpeg bindings), only needed for DECODER_BACKEND=pyav
+except ImportError:
+    av = None
+
+AWS_REGION = os.getenv("AWS_REGION", "us-west-2")
+s3_client = boto3.client('s3', region_name=AWS_REGION)
+
+# Video decoder: "opencv" (cv2.VideoCapture) or "pyav" (FFmpeg codec threading via PyAV)
+DECODER_BACKEND = os.getenv("DECODER_BACKEND", "opencv")
+DECODER_BACKENDS = ("opencv", "pyav")
+DECODER_THREAD_TYPE = os.getenv("DECODER_THREAD_TYPE", "AUTO").upper()  # pyav: AUTO, FRAME, SLICE or NONE
+DECODER_THREADS = int(os.getenv("DECODER_THREADS", "0"))  # codec threads per decoder (0 = FFmpeg default)
+# pyav: with a scaled output, decode at 1/2, 1/4 or 1/8 size (FFmpeg lowres, IDCT-domain downscale) as far as
+# the output height allows. Only DCT codecs without in-loop filtering support it; H.264/HEVC decode full-size.
+DECODER_LOWRES = os.getenv("DECODER_LOWRES", "true").lower() == "true"
+DECODER_LOWRES_CODECS = ("mpeg1video", "mpeg2video", "mpeg4", "h263", "mjpeg")
+
+# S3 downloads: parallel ranged GETs written in place into a preallocated file
+S3_DOWNLOAD_PART_BYTES = int(os.getenv("S3_DOWNLOAD_PART_BYTES", str(16 * 1024 * 1024)))
+S3_DOWNLOAD_CONCURRENCY = int(os.getenv("S3_DOWNLOAD_CONCURRENCY", "8"))  # ranged GETs in flight per download
+S3_DOWNLOAD_MAX_BANDWIDTH = int(os.getenv("S3_DOWNLOAD_MAX_BANDWIDTH", "0"))  # bytes/s per download (0 = unlimited)
+
+# Node-local video cache shared by both services through a hostPath volume (empty = disabled)
+VIDEO_CACHE_DIR = os.getenv("VIDEO_CACHE_DIR", "")
+VIDEO_CACHE_MAX_BYTES = int(os.getenv("VIDEO_CACHE_MAX_BYTES", str(20 * 1024 ** 3)))  # 20 GB
+
+class PyAVCapture:
+    """cv2.VideoCapture-compatible reader backed by PyAV, with FFmpeg frame/slice threading.
+
+    Implements the subset the samplers use (get/set/grab/retrieve/read/isOpened/release).
+    grab() decodes without colour conversion; retrieve() converts the last decoded frame
+    to BGR, scaled to output_max_height in the same swscale pass when set. With lowres
+    (and a codec in DECODER_LOWRES_CODECS) the codec already decodes at reduced size.
+    """
+
+    def __init__(self, path, thread_type=DECODER_THREAD_TYPE, thread_count=DECODER_THREADS, output_max_height=0,
+                 lowres=DECODER_LOWRES):
+        if av is None:
+            raise RuntimeError("DECODER_BACKEND=pyav requires the 'av' package")
+        self.container = av.open(path)
+        self.stream = self.container.streams.video[0]
+        if thread_type != "NONE":
+            self.stream.thread_type = thread_type
+            self.stream.codec_context.thread_count = thread_count
+        rate = self.stream.average_rate or self.stream.guessed_rate
+        self.fps = float(rate) if rate else 0.0
+        self.width = self.stream.codec_context.width
+        self.height = self.stream.codec_context.height
+        self.frame_count = self.stream.frames
+        if not self.frame_count and self.container.duration and self.fps:
+            self.frame_count = int(self.container.duration / av.time_base * self.fps)
+        self.output_size = None
+        if 0 < output_max_height < self.height:
+            self.output_size = (max(1, int(round(self.width * output_max_height / self.height))), output_max_height)
+        self.lowres = 0
+        if self.output_size and lowres and self.stream.codec_context.name in DECODER_LOWRES_CODECS:
+            while self.lowres < 3 and self.height >> (self.lowres + 1) >= output_max_height:
+                self.lowres += 1
+            if self.lowres:
+                self.stream.codec_context.options = {"lowres": str(self.lowres)}
+        self.position = 0
+        self._frames = self.container.decode(self.stream)
+        self._pending = None
+        self._frame = None
+
+    def isOpened(self):
+        return self.container is not None
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.frame_count)
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        return 0.0
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            value = round(value * self.fps / 1000.0)
+        elif prop != cv2.CAP_PROP_POS_FRAMES:
+            return False
+        self._seek(int(value))
+        return True
+
+    def _frame_index(self, frame):
+        if frame.pts is None or not self.fps:
+            return None
+        start = self.stream.start_time or 0
+        return int(round(float((frame.pts - start) * self.stream.time_base) * self.fps))
+
+    def _seek(self, target):
+        """Seek to the keyframe at or before target, then decode forward to it (frame-accurate)"""
+        if target == self.position:
+            return
+        start = self.stream.start_time or 0
+        self.container.seek(start + int(target / self.fps / self.stream.time_base), stream=self.stream,
+                            backward=True)
+        self._frames = self.container.decode(self.stream)
+        self._pending = None
+        for frame in self._frames:
+            index = self._frame_index(frame)
+            if index is None or index >= target:
+                self._pending = frame
+                break
+        self.position = target
+
+    def seek_keyframe(self, target):
+        """Jump to the keyframe at or before frame `target` and decode only that frame; returns its index.
+
+        Unlike set(), nothing between the keyframe and the target is decoded, so the frame
+        precedes the target by up to one keyframe interval (GOP). None at the end of the stream.
+        """
+        start = self.stream.start_time or 0
+        self.container.seek(start + int(target / self.fps / self.stream.time_base), stream=self.stream,
+                            backward=True, any_frame=False)
+        self._frames = self.container.decode(self.stream)
+        self._pending = None
+        try:
+            self._frame = next(self._frames)
+        except (StopIteration, av.FFmpegError):
+            self._frame = None
+            return None
+        index = self._frame_index(self._frame)
+        index = target if index is None else index
+        self.position = index + 1
+        return index
+
+    def grab(self):
+        if self._pending is not None:
+            self._frame, self._pending = self._pending, None
+        else:
+            try:
+                self._frame = next(self._frames)
+            except (StopIteration, av.FFmpegError):
+                self._frame = None
+                return False
+        self.position += 1
+        return True
+
+    def retrieve(self):
+        if self._frame is None:
+            return False, None
+        if self.output_size is None:
+            return True, self._frame.to_ndarray(format="bgr24")
+        width, height = self.output_size
+        return True, self._frame.to_ndarray(format="bgr24", width=width, height=height, interpolation="AREA")
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def release(self):
+        if self.container is not None:
+            self.container.close()
+            self.container = None
+
+def open_video(path, backend=DECODER_BACKEND, output_max_height=0):
+    """Open a video with the configured decoder backend; returns a cv2.VideoCapture-like handle"""
+    if backend == "pyav":
+        return PyAVCapture(path, output_max_height=output_max_height)
+    if backend != "opencv":
+        raise ValueError(f"Unknown decoder backend '{backend}', expected one of {DECODER_BACKENDS}")
+    if DECODER_THREADS > 0:
+        return cv2.VideoCapture(path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_N_THREADS, DECODER_THREADS])
+    return cv2.VideoCapture(path)
+
+class BufferWriter(io.RawIOBase):
+    """Seekable writer over a preallocated buffer, so the transfer manager writes each part in place"""
+
+    def __init__(self, buffer):
+        self.view = memoryview(buffer).cast("B")
+        self.offset = 0
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.offset
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        self.offset = offset
+        return offset
+
+    def tell(self):
+        return self.offset
+
+    def write(self, data):
+        end = self.offset + len(data)
+        self.view[self.offset:end] = data
+        self.offset = end
+        return len(data)
+
+def s3_transfer_config(part_bytes=S3_DOWNLOAD_PART_BYTES, concurrency=S3_DOWNLOAD_CONCURRENCY,
+                       max_bandwidth=S3_DOWNLOAD_MAX_BANDWIDTH):
+    """TransferConfig for download_s3_object (objects larger than one part are fetched in parallel parts)"""
+    return TransferConfig(multipart_threshold=part_bytes, multipart_chunksize=part_bytes,
+                          max_concurrency=max(1, concurrency), use_threads=concurrency > 1,
+                          max_bandwidth=max_bandwidth or None)
+
+def download_s3_object(bucket, key, destination, config=None):
+    """Download an S3 object with parallel ranged GETs, writing each part at its offset.
+
+    destination is a file path (preallocated to the object size, no temp-file rename),
+    a seekable binary file, or a writable buffer (bytearray/memoryview/mmap) at least as
+    large as the object. Returns throughput metrics.
+    """
+    config = config or s3_transfer_config()
+    size = s3_client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+    start = time.perf_counter()
+    if isinstance(destination, (str, os.PathLike)):
+        with open(destination, "wb") as f:
+            try:
+                os.posix_fallocate(f.fileno(), 0, max(1, size))
+            except (AttributeError, OSError):
+                pass  # filesystem without fallocate: parts extend the file as they land
+        with open(destination, "r+b") as f:
+            s3_client.download_fileobj(bucket, key, f, Config=config)
+            f.truncate(size)
+    elif hasattr(destination, "seek"):
+        s3_client.download_fileobj(bucket, key, destination, Config=config)
+    else:
+        writer = BufferWriter(destination)
+        if len(writer.view) < size:
+            raise ValueError(f"Buffer of {len(writer.view)} bytes is too small for s3://{bucket}/{key} ({size} bytes)")
+        s3_client.download_fileobj(bucket, key, writer, Config=config)
+    seconds = time.perf_counter() - start
+
+    metrics = {
+        "bytes": size,
+        "seconds": round(seconds, 3),
+        "mb_per_s": round(size / 1e6 / seconds, 1) if seconds > 0 else 0.0,
+        "part_bytes": config.multipart_chunksize,
+        "concurrency": config.max_concurrency if config.use_threads else 1
+    }
+    print(f"📥 Downloaded s3://{bucket}/{key}: {size / 1e6:.1f} MB in {seconds:.2f}s ({metrics['mb_per_s']} MB/s)")
+    return metrics
+
+class VideoCache:
+    """Size-bounded on-disk video cache keyed by S3 key + ETag, safe across processes and pods.
+
+    Entries are written to a temp file in the cache directory and renamed into place, so
+    readers never see partial files. Readers hold a shared flock on the entry while they
+    use it and bump its mtime (LRU order); eviction only removes entries it can lock
+    exclusively. An entry lock stops two processes downloading the same video: entries share
+    256 lock files by name prefix, and lock files are never removed (unlinking one would let a
+    waiter on the old inode and a newcomer on a new file both hold "the" lock).
+    """
+
+    STALE_PART_SECONDS = 3600
+
+    def __init__(self, directory, max_bytes=VIDEO_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def entry_name(self, bucket, key, etag):
+        return hashlib.sha256(f"{bucket}/{key}:{etag}".encode()).hexdigest()
+
+    def entry_path(self, bucket, key, etag):
+        return os.path.join(self.directory, f"{self.entry_name(bucket, key, etag)}.mp4")
+
+    @contextlib.contextmanager
+    def _locked(self, lock_name):
+        with open(os.path.join(self.directory, lock_name), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _entry_lock(self, path):
+        return self._locked(f"{os.path.basename(path)[:2]}.lock")
+
+    def _open_entry(self, path):
+        """Open and share-lock an existing entry, or return None if it is not cached"""
+        try:
+            entry = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        fcntl.flock(entry, fcntl.LOCK_SH)
+        if os.fstat(entry.fileno()).st_nlink == 0:
+            entry.close()  # evicted between open() and flock()
+            return None
+        os.utime(path)
+        return entry
+
+    def _evict(self, incoming_bytes):
+        """Remove least recently used entries (oldest mtime) until incoming_bytes fits"""
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if name.endswith(".part") and now - stat.st_mtime > self.STALE_PART_SECONDS:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(path)  # left behind by a crashed download
+            elif name.endswith(".mp4"):
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries) + incoming_bytes
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            with open(path, "rb") as entry:
+                try:
+                    fcntl.flock(entry, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # in use by a reader
+                os.unlink(path)
+                total -= size
+                print(f"🧹 Evicted {os.path.basename(path)} from video cache ({size / 1e6:.1f} MB)")
+
+    def open_cached(self, bucket, key, etag):
+        """Share-locked file object for a cached entry (close it when done), or None on a miss"""
+        return self._open_entry(self.entry_path(bucket, key, etag))
+
+    def begin_part(self, bucket, key, etag, size):
+        """Make room for an incoming entry of `size` bytes; returns the temp path to write it to"""
+        with self._locked("cache.lock"):
+            self._evict(size)
+        return f"{self.entry_path(bucket, key, etag)}.{os.getpid()}.{threading.get_ident()}.part"
+
+    def commit_part(self, bucket, key, etag, part):
+        """Move a completely written part into the cache, unless another process cached the entry first"""
+        path = self.entry_path(bucket, key, etag)
+        with self._entry_lock(path):
+            if os.path.exists(path):
+                os.unlink(part)
+            else:
+                os.rename(part, path)
+
+    @contextlib.contextmanager
+    def fetch(self, bucket, key, stats=None):
+        """Yield a local path for s3://bucket/key, downloading into the cache on a miss"""
+        head = s3_client.head_object(Bucket=bucket, Key=key)
+        etag = head["ETag"].strip('"')
+        path = self.entry_path(bucket, key, etag)
+        if stats is not None:
+            stats["video_cache"] = "hit"
+
+        if head["ContentLength"] > self.max_bytes:
+            # Larger than the whole cache: download next to it but never keep it
+            if stats is not None:
+                stats["video_cache"] = "bypass"
+            part = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+            try:
+                metrics = download_s3_object(bucket, key, part)
+                if stats is not None:
+                    stats["download"] = metrics
+                yield part
+            finally:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(part)
+            return
+
+        entry = self._open_entry(path)
+        if entry is None:
+            with self._entry_lock(path):
+                entry = self._open_entry(path)  # another process may have just finished it
+                if entry is None:
+                    if stats is not None:
+                        stats["video_cache"] = "miss"
+                    part = self.begin_part(bucket, key, etag, head["ContentLength"])
+                    try:
+                        metrics = download_s3_object(bucket, key, part)
+                        if stats is not None:
+                            stats["download"] = metrics
+                        entry = open(part, "rb")
+                        fcntl.flock(entry, fcntl.LOCK_SH)  # held before the entry becomes visible
+                        os.rename(part, path)
+                    finally:
+                        with contextlib.suppress(FileNotFoundError):
+                            os.unlink(part)
+        try:
+            yield path
+        finally:
+            entry.close()
+
+video_cache = VideoCache(VIDEO_CACHE_DIR) if VIDEO_CACHE_DIR else None
+
+@contextlib.contextmanager
+def local_video(bucket, key, stats=None):
+    """Yield a local path for an S3 video: from the node-local cache, or a temp file removed afterwards"""
+    if video_cache is not None:
+        with video_cache.fetch(bucket, key, stats) as path:
+            yield path
+        return
+    with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as tmp_file:
+        tmp_path = tmp_file.name
+    try:
+        metrics = download_s3_object(bucket, key, tmp_path)
+        if stats is not None:
+            stats["download"] = metrics
+        yield tmp_path
+    finally:
+        # Clean up temp file
+        os.unlink(tmp_path)